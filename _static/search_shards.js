@@ -0,0 +1,61 @@
+// Load only the parts of the search index needed for the query, written to
+// _searchindex/ by _tools/search_shards.py, instead of all of searchindex.js.
+// Loaded by _templates/search.html after Sphinx's searchtools.js.
+
+const SearchShards = {
+  _waiting: new Map(),
+
+  // Called by the scripts in _searchindex/
+  load: (name, data) => {
+    const resolve = SearchShards._waiting.get(name);
+    SearchShards._waiting.delete(name);
+    if (resolve) resolve(data);
+  },
+
+  _fetch: (name) =>
+    new Promise((resolve, reject) => {
+      SearchShards._waiting.set(name, resolve);
+      const script = document.createElement("script");
+      script.src = `${document.documentElement.dataset.content_root}_searchindex/${name}.js`;
+      script.onerror = () => reject(new Error(`cannot load ${script.src}`));
+      document.body.appendChild(script);
+    }),
+
+  // Must match shard_name() in _tools/search_shards.py
+  shardName: (term, prefixLength) => {
+    const prefix = Array.from(term).slice(0, prefixLength).join("");
+    if (/^[a-z0-9]+$/.test(prefix)) return prefix;
+    const bytes = new TextEncoder().encode(prefix);
+    return `_${Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join("")}`;
+  },
+
+  init: async () => {
+    const index = { terms: {}, titleterms: {} };
+    try {
+      const meta = await SearchShards._fetch("_meta");
+      Object.assign(index, meta.index);
+      const query = new URLSearchParams(window.location.search).get("q");
+      if (query) {
+        // The terms as stemmed by Sphinx, to look up in the index
+        const [, searchTerms, excludedTerms] = Search._parseQuery(query);
+        const names = new Set(
+          [...searchTerms, ...excludedTerms]
+            .map((term) => SearchShards.shardName(term, meta.prefix_length))
+            .filter((name) => meta.shards.includes(name)),
+        );
+        const shards = await Promise.all([...names].map(SearchShards._fetch));
+        shards.forEach((shard) => {
+          Object.assign(index.terms, shard.terms);
+          Object.assign(index.titleterms, shard.titleterms);
+        });
+      }
+    } catch (error) {
+      console.warn(`${error.message}, loading the full search index`);
+      Search.loadIndex(`${document.documentElement.dataset.content_root}searchindex.js`);
+      return;
+    }
+    Search.setIndex(index);
+  },
+};
+
+SearchShards.init();
@@ -0,0 +1,288 @@
+"""Benchmark full builds of the devguide and keep a history of the results.
+
+Each builder is run through ``make`` in three modes:
+
+``cold``
+    from an empty build directory
+``warm``
+    again, with nothing changed
+``touched``
+    after updating the modification time of one source file (--touch)
+
+Each builder gets a directory in _build/benchmark/, holding a copy of the
+files tracked by git as they are in the working tree, the build output, and
+its own cache (see DEVGUIDE_CACHE_DIR in http_cache.py). A cold run starts
+from a new copy and an empty cache, so nothing is left over from earlier
+builds. The release-cycle files are generated from _tools/fixtures/ into the
+copy, not into include/ and _static/. The builds don't use the network:
+intersphinx inventories are copied from the cache in _build/.cache/, or are
+left out.
+
+The wall time, the build phases recorded by the build_timings extension
+and the size of the output of every run are appended to a history file, one
+JSON object per line. Each run is compared against the median of the last
+--window runs of the same builder and mode on the same machine, and the
+script exits with status 1 if any is slower by more than --threshold:
+
+    python _tools/benchmark_build.py
+    python _tools/benchmark_build.py --builders html --modes cold,warm
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from http_cache import CACHE_DIR
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "release-cycle.json"
+BUILDDIR = ROOT / "_build" / "benchmark"
+HISTORY = CACHE_DIR / "benchmark-build.jsonl"
+# Downloads rather than build results, reused to stay offline
+INVENTORIES = CACHE_DIR / "intersphinx"
+MODES = ("cold", "warm", "touched")
+# Versions recorded with every run, to spot the effect of upgrades
+PACKAGES = ("sphinx", "furo", "docutils", "jinja2")
+
+# Changes smaller than this are noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.5
+
+
+def installed_packages(venv: Path) -> dict[str, str]:
+    """Return the name and version of every package installed in *venv*."""
+    script = (
+        "import importlib.metadata as m, json;"
+        "print(json.dumps({d.name.lower(): d.version for d in m.distributions()}))"
+    )
+    result = subprocess.run(
+        [venv / "bin" / "python3", "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def output_size(outdir: Path) -> tuple[int, int]:
+    """Return the number of files in *outdir* and their total size."""
+    sizes = [path.stat().st_size for path in outdir.rglob("*") if path.is_file()]
+    return len(sizes), sum(sizes)
+
+
+def copy_sources(srcdir: Path) -> None:
+    """Copy the files tracked by git to *srcdir*, unless they're there already.
+
+    Modification times are kept, so that unchanged files don't look changed
+    to Sphinx.
+    """
+    tracked = subprocess.run(
+        ["git", "ls-files", "-z"], cwd=ROOT, capture_output=True, check=True
+    ).stdout.decode()
+    for name in filter(None, tracked.split("\0")):
+        source, target = ROOT / name, srcdir / name
+        if not source.is_file():
+            # Deleted in the working tree
+            continue
+        if target.is_file() and target.read_bytes() == source.read_bytes():
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+
+
+def build(builder: str, mode: str, *, jobs: str, touch: Path) -> dict:
+    """Run ``make <builder>`` in *mode*, returning its measurements."""
+    builddir = BUILDDIR / builder
+    srcdir = builddir / "src"
+    cachedir = builddir / ".cache"
+    options = []
+    if mode == "cold":
+        shutil.rmtree(builddir, ignore_errors=True)
+        if INVENTORIES.is_dir():
+            shutil.copytree(INVENTORIES, cachedir / INVENTORIES.name)
+        options.append("RELEASE_CYCLE_OPTS=--force")
+    copy_sources(srcdir)
+    if mode == "touched":
+        os.utime(srcdir / touch.resolve().relative_to(ROOT))
+
+    git_dir = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+    env = {
+        **os.environ,
+        "DEVGUIDE_CACHE_DIR": str(cachedir),
+        # For the pages' last-updated dates
+        "GIT_DIR": git_dir,
+        "GIT_WORK_TREE": str(srcdir),
+        "RELEASE_CYCLE_JSON": str(FIXTURE),
+        "RELEASE_CYCLE_OFFLINE": "1",
+        "INTERSPHINX_OFFLINE": "1",
+    }
+    start = time.perf_counter()
+    result = subprocess.run(
+        [
+            "make",
+            builder,
+            f"BUILDDIR={builddir}",
+            f"VENVDIR={ROOT / 'venv'}",
+            f"JOBS={jobs}",
+            *options,
+        ],
+        cwd=srcdir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode:
+        sys.exit(f"make {builder} failed:\n{result.stdout[-2000:]}{result.stderr}")
+
+    timings = json.loads(
+        (builddir / f"timings-{builder}.json").read_text(encoding="utf-8")
+    )
+    files, size = output_size(builddir / builder)
+    return {
+        "seconds": seconds,
+        "phases": timings["phases"],
+        "documents_read": len(timings.get("read", {})),
+        "documents_written": len(timings.get("write", {})),
+        "output_files": files,
+        "output_bytes": size,
+    }
+
+
+def read_history(path: Path) -> list[dict]:
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    return [json.loads(line) for line in lines if line]
+
+
+def baseline(history: list[dict], run: dict, window: int) -> float | None:
+    """Return the median time of the last *window* runs comparable to *run*."""
+    previous = [
+        entry["seconds"]
+        for entry in history
+        if entry["machine"] == run["machine"]
+        and entry["builder"] == run["builder"]
+        and entry["mode"] == run["mode"]
+    ][-window:]
+    return statistics.median(previous) if previous else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--builders",
+        default="html,dirhtml",
+        help="Comma-separated builders to run (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--modes",
+        default=",".join(MODES),
+        help="Comma-separated modes to run, in order (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--touch",
+        type=Path,
+        default=ROOT / "index.rst",
+        help="Source file to touch in the 'touched' mode (default: index.rst)",
+    )
+    parser.add_argument(
+        "--jobs", default="auto", help="Parallel jobs for Sphinx (default: auto)"
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=HISTORY,
+        help="History file to compare against and append to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=5,
+        help="Number of previous runs making up the baseline (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    if unknown := set(modes) - set(MODES):
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    packages = installed_packages(ROOT / "venv") if (ROOT / "venv").is_dir() else {}
+    commit = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True
+    ).stdout.strip()
+    common = {
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "jobs": args.jobs,
+        "packages": {name: packages.get(name) for name in PACKAGES},
+        "packages_digest": hashlib.sha256(
+            json.dumps(packages, sort_keys=True).encode()
+        ).hexdigest(),
+    }
+
+    history = read_history(args.history)
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    regressions = []
+    print(f"{'builder':<8} {'mode':<8} {'time (s)':>9} {'baseline':>9} {'output':>10}")
+    with open(args.history, "a", encoding="utf-8") as f:
+        for builder in args.builders.split(","):
+            for mode in modes:
+                run = {
+                    **common,
+                    "builder": builder,
+                    "mode": mode,
+                    **build(builder, mode, jobs=args.jobs, touch=args.touch),
+                }
+                base = baseline(history, run, args.window)
+                f.write(json.dumps(run) + "\n")
+                f.flush()
+
+                print(
+                    f"{builder:<8} {mode:<8} {run['seconds']:>9.2f}"
+                    f" {'-' if base is None else f'{base:.2f}':>9}"
+                    f" {run['output_bytes'] / 1024 / 1024:>7.1f} MiB"
+                )
+                if (
+                    base is not None
+                    and run["seconds"] - base > MIN_SECONDS_DELTA
+                    and run["seconds"] > base * (1 + args.threshold)
+                ):
+                    regressions.append(
+                        f"{builder} {mode}: {base:.2f} s -> {run['seconds']:.2f} s"
+                    )
+
+    if regressions:
+        print("\nRegressions:", *regressions, sep="\n  ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Benchmark generate_release_cycle.py against synthetic release cycles.
+
+For each dataset size, a synthetic release-cycle.json fixture is written to
+a temporary directory and run through each stage of the generator, without
+touching the network or the generated files. Wall time (best of --repeat
+runs), peak traced memory and output size are reported per stage. Results
+can be saved as JSON and compared against a previous run:
+
+    python _tools/benchmark_release_cycle.py --output baseline.json
+    python _tools/benchmark_release_cycle.py --baseline baseline.json
+
+The second command exits with status 1 if any stage is slower, or uses more
+memory, than in the baseline by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from generate_release_cycle import (
+    TEMPLATE,
+    VARIANTS,
+    ReleaseCycle,
+    Versions,
+    make_environment,
+    render_charts,
+)
+from release_cycle_data import read_release_cycle
+
+TODAY = "2026-10-18"
+STATUSES = ("feature", "prerelease", "bugfix", "bugfix", "security", "security")
+
+# Changes smaller than these are noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.005
+MIN_BYTES_DELTA = 64 * 1024
+
+
+def synthetic_cycle(count: int) -> dict[str, dict[str, str | int]]:
+    """Return a release-cycle.json-like dict with *count* versions."""
+    # Spread the releases over at most ~7000 years to stay within dt.date
+    spacing = max(1, min(365, 7000 * 365 // count))
+    first = dt.date(1990, 1, 1)
+    data = {}
+    for i in range(count):
+        key = f"{3 + i // 1000}.{i % 1000}"
+        release = first + dt.timedelta(days=i * spacing)
+        newest = count - 1 - i
+        data[key] = {
+            "branch": "main" if newest == 0 else key,
+            "pep": 1000 + i,
+            "status": STATUSES[newest] if newest < len(STATUSES) else "end-of-life",
+            "first_release": release.isoformat(),
+            "end_of_life": f"{release.year + 5:04}-{release.month:02}",
+            "release_manager": f"Release Manager {i % 7}",
+        }
+    return data
+
+
+def _text_size(outputs: dict[str, str]) -> int:
+    return sum(len(text.encode("utf-8")) for text in outputs.values())
+
+
+def run_stages(fixture: Path, *, trace: bool = False) -> dict[str, dict[str, float]]:
+    """Run every stage once, returning its measurements keyed by stage name.
+
+    With *trace*, tracemalloc must be running, and the peak traced memory of
+    each stage is recorded too.
+    """
+    results = {}
+
+    def stage(name, func, size=lambda result: 0):
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        results[name] = {"seconds": seconds, "output_bytes": size(result)}
+        if trace:
+            results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+        return result
+
+    raw = stage("read", lambda: read_release_cycle(source=fixture), len)
+    data = stage("decode", lambda: json.loads(raw.decode("utf-8")))
+    cycle = stage("model", lambda: ReleaseCycle.from_json(data))
+    stage("views", lambda: [Versions(cycle, variant) for variant in VARIANTS])
+    stage("csv", lambda: Versions(cycle).render_csv(TODAY), _text_size)
+    template = stage("template", lambda: make_environment().get_template(TEMPLATE.name))
+    stage(
+        "svg",
+        lambda: render_charts(cycle, VARIANTS, TODAY, template=template),
+        _text_size,
+    )
+    return results
+
+
+def benchmark(count: int, repeat: int) -> dict[str, dict[str, float]]:
+    """Benchmark every stage against a synthetic cycle of *count* versions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = Path(tmp) / "release-cycle.json"
+        fixture.write_text(json.dumps(synthetic_cycle(count)), encoding="utf-8")
+
+        runs = []
+        for _ in range(repeat):
+            gc.collect()
+            runs.append(run_stages(fixture))
+
+        # Tracing slows everything down, so measure memory in a separate run
+        gc.collect()
+        tracemalloc.start()
+        try:
+            traced = run_stages(fixture, trace=True)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        name: {
+            "seconds": min(run[name]["seconds"] for run in runs),
+            "peak_bytes": traced[name]["peak_bytes"],
+            "output_bytes": traced[name]["output_bytes"],
+        }
+        for name in traced
+    }
+
+
+def regressions(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    threshold: float,
+) -> list[str]:
+    """Describe every measurement that got worse than *baseline* allows."""
+    found = []
+    for count, stages in results.items():
+        for name, measured in stages.items():
+            base = baseline.get(count, {}).get(name)
+            if base is None:
+                continue
+            for metric, min_delta in (
+                ("seconds", MIN_SECONDS_DELTA),
+                ("peak_bytes", MIN_BYTES_DELTA),
+            ):
+                new, old = measured[metric], base[metric]
+                if new - old > min_delta and new > old * (1 + threshold):
+                    found.append(
+                        f"{count} versions, {name}: {metric} {old:.6g} -> {new:.6g}"
+                    )
+    return found
+
+
+def print_table(results: dict[str, dict[str, dict[str, float]]]) -> None:
+    print(f"{'versions':>9} {'stage':<9} {'time (ms)':>11} {'peak (KiB)':>11}", end="")
+    print(f" {'output (KiB)':>13}")
+    for count, stages in results.items():
+        for name, measured in stages.items():
+            print(
+                f"{count:>9} {name:<9} {measured['seconds'] * 1000:>11.2f}"
+                f" {measured['peak_bytes'] / 1024:>11.1f}"
+                f" {measured['output_bytes'] / 1024:>13.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes",
+        default="30,1000,100000",
+        help="Comma-separated numbers of versions to benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs per size; the best is kept (default: %(default)s)",
+    )
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    parser.add_argument(
+        "--baseline", type=Path, help="Compare against results saved by --output"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown or memory growth (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for count in map(int, args.sizes.split(",")):
+        results[str(count)] = benchmark(count, args.repeat)
+    print_table(results)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        if found := regressions(results, baseline, args.threshold):
+            print("\nRegressions:", *found, sep="\n  ")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
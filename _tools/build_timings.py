@@ -0,0 +1,262 @@
+"""Sphinx extension: report where the time of a build goes.
+
+This records the wall time of:
+
+* evaluating ``conf.py``, and any block of it wrapped in ``timed()``
+* the setup of each extension listed after this one in ``extensions``
+* the phases of the build (reading, writing, ...)
+* reading, resolving and writing each document
+* every event handler, totalled per extension and event
+
+At the end of the build, the results are written to ``timings-<builder>.json``
+and summarised, slowest first, in ``timings-<builder>.txt``, next to the
+builder's output directory (``_build/`` for ``make html``).
+
+To time all of ``conf.py``, list this extension first and import it early.
+When reading or writing in parallel, the worker processes pass their
+timings back through files in the doctree directory.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    from docutils import nodes
+    from sphinx.application import Sphinx
+    from sphinx.builders import Builder
+    from sphinx.config import Config
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_LENGTH = 15
+
+_imported = time.perf_counter()
+_main_pid = os.getpid()
+
+
+class Timings:
+    """Total seconds, by category and then by name."""
+
+    def __init__(self) -> None:
+        self.totals: defaultdict[str, defaultdict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def add(self, category: str, name: str, seconds: float) -> None:
+        self.totals[category][name] += seconds
+
+    def update(self, totals: dict[str, dict[str, float]]) -> None:
+        for category, names in totals.items():
+            for name, seconds in names.items():
+                self.add(category, name, seconds)
+
+
+# Where timings are currently recorded: replaced while a document is read or
+# written, so that a worker process can pass on the timings of its documents
+_recorder = Timings()
+
+
+@contextmanager
+def timed(category: str, name: str) -> Generator[None]:
+    """Record the wall time of the block as *name* in *category*."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _recorder.add(category, name, time.perf_counter() - start)
+
+
+def _spool_dir(app: Sphinx) -> Path:
+    return Path(app.doctreedir) / "timings"
+
+
+def _per_document(app: Sphinx, phase: str, func: Callable[..., None]):
+    """Wrap *func*, which reads or writes one document, to time it."""
+
+    @functools.wraps(func)
+    def wrapper(docname: str, *args, **kwargs) -> None:
+        global _recorder
+        outer, _recorder = _recorder, Timings()
+        try:
+            with timed(phase, docname):
+                func(docname, *args, **kwargs)
+        finally:
+            inner, _recorder = _recorder, outer
+        if os.getpid() == _main_pid:
+            _recorder.update(inner.totals)
+        else:
+            spool = _spool_dir(app)
+            spool.mkdir(parents=True, exist_ok=True)
+            with open(spool / f"{os.getpid()}.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(inner.totals) + "\n")
+
+    return wrapper
+
+
+def _extension_of(app: Sphinx, module: str) -> str:
+    """Return the name of the extension that *module* belongs to."""
+    candidates = [
+        name
+        for name in app.extensions
+        if module == name or module.startswith(f"{name}.")
+    ]
+    return max(candidates, key=len, default=module)
+
+
+def _handler(app: Sphinx, event: str, handler: Callable[..., object]):
+    name = f"{_extension_of(app, handler.__module__)} ({event})"
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with timed("handlers", name):
+            return handler(*args, **kwargs)
+
+    return wrapper
+
+
+def _setup_extension(app: Sphinx, setup_extension: Callable[[str], None]):
+    @functools.wraps(setup_extension)
+    def wrapper(extname: str) -> None:
+        with timed("extension setup", extname):
+            setup_extension(extname)
+
+    return wrapper
+
+
+def _start_phase(app: Sphinx, phase: str | None) -> None:
+    """End the current phase of the build, and start *phase*."""
+    now = time.perf_counter()
+    previous, started = app._build_timings_phase
+    _recorder.add("phases", previous, now - started)
+    app._build_timings_phase = (phase, now)
+
+
+def _config_inited(app: Sphinx, config: Config) -> None:
+    del app.setup_extension
+    # Handlers for this event that haven't run yet won't be timed
+    for event, listeners in app.events.listeners.items():
+        listeners[:] = [
+            listener
+            if listener.handler.__module__ == __name__
+            else listener._replace(handler=_handler(app, event, listener.handler))
+            for listener in listeners
+        ]
+    _start_phase(app, "initialise")
+
+
+def _before_read(app: Sphinx, env: BuildEnvironment, docnames: list[str]) -> None:
+    _start_phase(app, "read")
+
+
+def _env_updated(app: Sphinx, env: BuildEnvironment) -> None:
+    _start_phase(app, "check consistency")
+
+
+def _builder_inited(app: Sphinx) -> None:
+    builder = app.builder
+    builder.read_doc = _per_document(app, "read", builder.read_doc)
+    builder.write_doc = _per_document(app, "write", builder.write_doc)
+    for path in _spool_dir(app).glob("*.jsonl"):
+        path.unlink()
+
+
+def _write_started(app: Sphinx, builder: Builder) -> None:
+    _start_phase(app, "write")
+    # Set here rather than when the builder is created, so that it isn't
+    # pickled along with the environment
+    env = app.env
+    get_and_resolve_doctree = env.get_and_resolve_doctree
+
+    @functools.wraps(get_and_resolve_doctree)
+    def wrapper(docname: str, *args, **kwargs) -> nodes.document:
+        with timed("resolve", docname):
+            return get_and_resolve_doctree(docname, *args, **kwargs)
+
+    env.get_and_resolve_doctree = wrapper
+
+
+def _collect_spooled(app: Sphinx) -> None:
+    spool = _spool_dir(app)
+    for path in spool.glob("*.jsonl"):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            _recorder.update(json.loads(line))
+        path.unlink()
+    with contextlib.suppress(OSError):
+        spool.rmdir()
+
+
+def _build_finished(app: Sphinx, exception: Exception | None) -> None:
+    _start_phase(app, None)
+    app.env.__dict__.pop("get_and_resolve_doctree", None)
+    _collect_spooled(app)
+    if exception is not None:
+        return
+
+    totals = {
+        category: dict(sorted(names.items(), key=lambda item: -item[1]))
+        for category, names in _recorder.totals.items()
+    }
+    totals["phases"] = dict(_recorder.totals["phases"])
+    extensions = defaultdict(float)
+    for name, seconds in totals.get("handlers", {}).items():
+        extensions[name.rpartition(" (")[0]] += seconds
+    report = {
+        "builder": app.builder.name,
+        "parallel": app.parallel,
+        "total": time.perf_counter() - _imported,
+        "extensions": dict(sorted(extensions.items(), key=lambda item: -item[1])),
+        **totals,
+    }
+
+    base = Path(app.outdir).parent / f"timings-{app.builder.name}"
+    json_path = base.with_suffix(".json")
+    json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    base.with_suffix(".txt").write_text(format_summary(report), encoding="utf-8")
+    logger.info("build timings written to %s", json_path)
+
+
+def format_summary(report: dict) -> str:
+    """Return the slowest entries of each category of *report* as text."""
+    lines = [f"Total: {report['total']:.2f} s ({report['builder']} builder)"]
+    for category, names in report.items():
+        if not isinstance(names, dict) or not names:
+            continue
+        lines += ["", f"{category} ({sum(names.values()):.3f} s in total):"]
+        lines += [
+            f"  {seconds:8.3f} s  {name}"
+            for name, seconds in list(names.items())[:SUMMARY_LENGTH]
+        ]
+        if len(names) > SUMMARY_LENGTH:
+            lines.append(f"  ... and {len(names) - SUMMARY_LENGTH} more")
+    return "\n".join(lines) + "\n"
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    now = time.perf_counter()
+    _recorder.add("phases", "conf.py", now - _imported)
+    app._build_timings_phase = ("extension setup", now)
+    # Time the setup of the extensions loaded after this one
+    app.setup_extension = _setup_extension(app, app.setup_extension)
+
+    app.connect("config-inited", _config_inited, priority=0)
+    app.connect("builder-inited", _builder_inited)
+    app.connect("env-before-read-docs", _before_read, priority=0)
+    app.connect("env-updated", _env_updated, priority=1000)
+    app.connect("write-started", _write_started, priority=0)
+    app.connect("build-finished", _build_finished, priority=1000)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
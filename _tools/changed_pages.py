@@ -0,0 +1,178 @@
+"""List the pages to rebuild after some files changed.
+
+The reStructuredText sources are scanned for the files they pull in with
+``.. include::``, ``.. literalinclude::`` and the ``:file:`` option of
+``.. csv-table::`` and ``.. raw::``. Inverting this gives, for every file, the
+pages that depend on it, directly or through other included files.
+
+The changed files are taken from the command line, or else from git: by
+default the uncommitted changes, or with --since, everything that changed
+since a commit. The changed pages and all their dependants are printed, one
+per line, ready to pass to sphinx-build, which then writes just those (see
+``make html-changed``).
+
+If a file that affects every page changed, such as conf.py or a template,
+nothing is printed, so that the whole site is built as usual.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import re
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# As exclude_patterns in conf.py
+EXCLUDE = ("_build", "venv*", "env*", "README.rst", ".github")
+
+# Changes to these affect every page
+GLOBAL_INPUTS = ("conf.py", "requirements.txt", "_templates/*", "_tools/*")
+
+DIRECTIVE = re.compile(r"^(\s*)\.\.\s+([\w-]+)::\s*(.*)$")
+FILE_OPTION = re.compile(r"^\s+:file:\s*(\S+)")
+# Directives whose argument is the file to include
+INCLUDE_DIRECTIVES = frozenset({"include", "literalinclude"})
+# Directives that take the file to include as their :file: option
+FILE_DIRECTIVES = frozenset({"csv-table", "raw"})
+
+
+def source_files(root: Path) -> list[Path]:
+    """Return every reStructuredText source file, relative to *root*."""
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            name
+            for name in dirnames
+            if not any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDE)
+        ]
+        rel = Path(dirpath).relative_to(root)
+        sources += [
+            rel / name
+            for name in filenames
+            if name.endswith(".rst") and (rel / name).as_posix() not in EXCLUDE
+        ]
+    return sorted(sources)
+
+
+def _resolve(source: Path, target: str) -> str | None:
+    """Return the path of *target*, as included from *source*, or None."""
+    if target.startswith("<"):
+        # One of docutils' standard definition files
+        return None
+    path = target[1:] if target.startswith("/") else source.parent / target
+    return Path(os.path.normpath(path)).as_posix()
+
+
+def included_files(root: Path, source: Path) -> set[str]:
+    """Return the paths of the files that *source* includes."""
+    lines = (root / source).read_text(encoding="utf-8").splitlines()
+    found = set()
+    for i, line in enumerate(lines):
+        if not (match := DIRECTIVE.match(line)):
+            continue
+        indent, name, argument = match.groups()
+        if name in INCLUDE_DIRECTIVES:
+            found.add(_resolve(source, argument.strip()))
+        elif name in FILE_DIRECTIVES:
+            # The options follow the directive, indented more deeply
+            for option in lines[i + 1 :]:
+                if not option.strip() or len(option) - len(option.lstrip()) <= len(
+                    indent
+                ):
+                    break
+                if file_match := FILE_OPTION.match(option):
+                    found.add(_resolve(source, file_match.group(1)))
+    found.discard(None)
+    return found
+
+
+def dependants_graph(root: Path) -> dict[str, set[str]]:
+    """Map every included file to the sources that include it directly."""
+    graph = defaultdict(set)
+    for source in source_files(root):
+        for path in included_files(root, source):
+            graph[path].add(source.as_posix())
+    return graph
+
+
+def affected_pages(
+    changed: list[str], graph: dict[str, set[str]], sources: set[str]
+) -> set[str]:
+    """Return the sources in *changed*, and every source depending on them."""
+    affected = set()
+    pending = list(changed)
+    while pending:
+        path = pending.pop()
+        if path in affected:
+            continue
+        affected.add(path)
+        pending += graph.get(path, ())
+    return affected & sources
+
+
+def changed_files(since: str | None) -> list[str]:
+    """Return the files changed since *since*, or not committed yet."""
+
+    def git(*args: str) -> list[str]:
+        output = subprocess.run(
+            ["git", "-c", "core.quotePath=false", *args],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        return output.splitlines()
+
+    if since:
+        files = git("diff", "--name-only", f"{since}...HEAD")
+    else:
+        files = []
+    files += git("diff", "--name-only", "HEAD")
+    files += git("ls-files", "--others", "--exclude-standard")
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Changed files, relative to the repository root (default: ask git)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="COMMIT",
+        help="Also include what changed between COMMIT and HEAD, e.g. main",
+    )
+    parser.add_argument(
+        "--graph",
+        action="store_true",
+        help="Print every included file and the sources depending on it instead",
+    )
+    args = parser.parse_args()
+
+    graph = dependants_graph(ROOT)
+    if args.graph:
+        for path, dependants in sorted(graph.items()):
+            print(f"{path}: {' '.join(sorted(dependants))}")
+        return
+
+    changed = args.files or changed_files(args.since)
+    if any(
+        fnmatch.fnmatch(path, pattern) for path in changed for pattern in GLOBAL_INPUTS
+    ):
+        return
+    sources = {source.as_posix() for source in source_files(ROOT)}
+    for page in sorted(affected_pages(changed, graph, sources)):
+        print(page)
+
+
+if __name__ == "__main__":
+    main()
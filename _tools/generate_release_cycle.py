@@ -4,14 +4,43 @@ from __future__ import annotations
 
 import argparse
 import calendar
+import cProfile
 import csv
 import datetime as dt
+import hashlib
+import io
 import json
-from functools import cache
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import starmap
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from urllib.request import urlopen
+from typing import TYPE_CHECKING
 
 import jinja2
+from http_cache import CACHE_DIR, write_atomic, write_if_changed
+from optimize_output import minify_css
+from release_cycle_data import read_release_cycle
+from release_cycle_layout import DEFAULT_SCALE, layout_chart
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable
+    from typing import TextIO
+
+TEMPLATE = Path(__file__).with_name("release_cycle_template.svg.jinja")
+# Files whose changes change the output
+SOURCES = (
+    TEMPLATE,
+    Path(__file__),
+    Path(__file__).with_name("release_cycle_layout.py"),
+    Path(__file__).with_name("optimize_output.py"),
+)
+MANIFEST = CACHE_DIR / "release-cycle-manifest.json"
 
 
 def csv_date(date_str: str, now_str: str) -> str:
@@ -36,159 +65,386 @@ def parse_date(date_str: str, *, last: bool = False) -> dt.date:
     return dt.date.fromisoformat(date_str)
 
 
-def parse_version(ver: str) -> list[int]:
-    return [int(i) for i in ver["key"].split(".")]
+def parse_version(ver: str) -> tuple[int, ...]:
+    return tuple(int(i) for i in ver.split("."))
 
 
-@cache
-def get_versions() -> dict[str, dict[str, str | int]]:
-    with urlopen("https://peps.python.org/api/release-cycle.json") as in_file:
-        return json.loads(in_file.read().decode("utf-8"))
+@dataclass(frozen=True, slots=True)
+class Version:
+    """One entry of release-cycle.json, with its dates parsed."""
 
+    key: str
+    branch: str
+    pep: int
+    status: str
+    first_release: str
+    end_of_life: str
+    release_manager: str
+    version_info: tuple[int, ...]
+    first_release_date: dt.date
+    start_security_date: dt.date
+    end_of_life_date: dt.date
 
-class Versions:
-    """For converting JSON to CSV and SVG."""
-
-    def __init__(self, *, limit_to_active=False, special_py27=False) -> None:
-        self.versions = get_versions()
-
-        # Generate a few additional fields
-        for key, version in self.versions.items():
-            version["key"] = key
-            ver_info = parse_version(version)
-            if ver_info >= [3, 13]:
-                full_years = 2
-            else:
-                full_years = 1.5
-            version["first_release_date"] = r1 = parse_date(version["first_release"])
-            version["start_security_date"] = r1 + dt.timedelta(days=full_years * 365)
-            version["end_of_life_date"] = parse_date(version["end_of_life"], last=True)
-
-        self.cutoff = min(ver["first_release_date"] for ver in self.versions.values())
-
-        if limit_to_active:
-            self.cutoff = min(
-                version["first_release_date"]
-                for version in self.versions.values()
-                if version["status"] != "end-of-life"
-            )
-            self.versions = {
-                key: version
-                for key, version in self.versions.items()
-                if version["end_of_life_date"] >= self.cutoff
-                or (special_py27 and key == "2.7")
-            }
-            if special_py27:
-                self.cutoff = min(self.cutoff, dt.date(2019, 8, 1))
-            self.id_key = "active"
+    @classmethod
+    def from_json(cls, key: str, details: dict[str, str | int]) -> Version:
+        version_info = parse_version(key)
+        if version_info >= (3, 13):
+            full_years = 2
         else:
-            self.id_key = "all"
+            full_years = 1.5
+        first_release_date = parse_date(details["first_release"])
+        return cls(
+            key=key,
+            branch=details["branch"],
+            pep=details["pep"],
+            status=details["status"],
+            first_release=details["first_release"],
+            end_of_life=details["end_of_life"],
+            release_manager=details["release_manager"],
+            version_info=version_info,
+            first_release_date=first_release_date,
+            start_security_date=first_release_date
+            + dt.timedelta(days=full_years * 365),
+            end_of_life_date=parse_date(details["end_of_life"], last=True),
+        )
+
 
-        self.sorted_versions = sorted(
-            self.versions.values(),
-            key=parse_version,
-            reverse=True,
+@dataclass(frozen=True, slots=True)
+class ReleaseCycle:
+    """All versions, newest first. Built once and shared by every view."""
+
+    versions: tuple[Version, ...]
+
+    @classmethod
+    def from_json(cls, data: dict[str, dict[str, str | int]]) -> ReleaseCycle:
+        versions = starmap(Version.from_json, data.items())
+        return cls(
+            tuple(sorted(versions, key=attrgetter("version_info"), reverse=True))
         )
 
+
+def earliest_release(cycle: ReleaseCycle) -> dt.date:
+    return min(version.first_release_date for version in cycle.versions)
+
+
+def earliest_active_release(cycle: ReleaseCycle) -> dt.date:
+    return min(
+        version.first_release_date
+        for version in cycle.versions
+        if version.status != "end-of-life"
+    )
+
+
+def any_version(version: Version, cutoff: dt.date) -> bool:
+    return True
+
+
+def alive_at_cutoff(version: Version, cutoff: dt.date) -> bool:
+    return version.end_of_life_date >= cutoff
+
+
+@dataclass(frozen=True, slots=True)
+class ChartVariant:
+    """Which versions one SVG chart shows, and where it is written."""
+
+    id_key: str
+    out_path: str
+    # Whether to show a version, given the chart's cutoff date
+    include: Callable[[Version, dt.date], bool] = any_version
+    # The date the chart starts at
+    cutoff: Callable[[ReleaseCycle], dt.date] = earliest_release
+    # Always show 2.7, separated from the rest by a gap
+    special_py27: bool = False
+    # Roughly the pixel size of the font; see release_cycle_layout.py
+    scale: float = DEFAULT_SCALE
+    # Charts inlined into the same page. In compact mode only the first one
+    # embeds the stylesheet, which applies to the whole HTML document.
+    page: str | None = None
+
+
+ALL_VERSIONS = ChartVariant("all", "_static/release-cycle-all.svg", page="versions.rst")
+ACTIVE_VERSIONS = ChartVariant(
+    "active",
+    "_static/release-cycle.svg",
+    include=alive_at_cutoff,
+    cutoff=earliest_active_release,
+    special_py27=True,
+    page="versions.rst",
+)
+# In the order they appear on their pages
+VARIANTS = (ACTIVE_VERSIONS, ALL_VERSIONS)
+
+
+class Versions:
+    """A view of the release cycle, for converting to CSV and SVG."""
+
+    def __init__(
+        self, cycle: ReleaseCycle, variant: ChartVariant = ALL_VERSIONS
+    ) -> None:
+        special_py27 = variant.special_py27
+        self.id_key = variant.id_key
+        self.scale = variant.scale
+        self.cutoff = variant.cutoff(cycle)
+        self.sorted_versions = tuple(
+            version
+            for version in cycle.versions
+            if variant.include(version, self.cutoff)
+            or (special_py27 and version.key == "2.7")
+        )
+        if special_py27:
+            self.cutoff = min(self.cutoff, dt.date(2019, 8, 1))
+
         # Set the row (Y coordinate) for the chart, to allow a gap between 2.7
         # and the rest
+        self.rows = {}
         y = len(self.sorted_versions) + (1 if special_py27 else 0)
         for version in self.sorted_versions:
-            if special_py27 and version["key"] == "2.7":
+            if special_py27 and version.key == "2.7":
                 y -= 1
-            version["y"] = y
+            self.rows[version.key] = y
             y -= 1
 
-    def write_csv(self) -> None:
-        """Output CSV files."""
-        now_str = str(dt.datetime.now(dt.timezone.utc))
-
+    def render_csv(self, today: str) -> dict[str, str]:
+        """Return the contents of the CSV files, keyed by output path."""
         versions_by_category = {"branches": {}, "end-of-life": {}}
         headers = None
         for details in self.sorted_versions:
             row = {
-                "Branch": details["branch"],
-                "Schedule": f":pep:`{details['pep']}`",
-                "Status": details["status"],
-                "First release": csv_date(details["first_release"], now_str),
-                "End of life": csv_date(details["end_of_life"], now_str),
-                "Release manager": details["release_manager"],
+                "Branch": details.branch,
+                "Schedule": f":pep:`{details.pep}`",
+                "Status": details.status,
+                "First release": csv_date(details.first_release, today),
+                "End of life": csv_date(details.end_of_life, today),
+                "Release manager": details.release_manager,
             }
             headers = row.keys()
-            cat = "end-of-life" if details["status"] == "end-of-life" else "branches"
-            versions_by_category[cat][details["key"]] = row
+            cat = "end-of-life" if details.status == "end-of-life" else "branches"
+            versions_by_category[cat][details.key] = row
 
+        outputs = {}
         for cat, versions in versions_by_category.items():
-            with open(f"include/{cat}.csv", "w", encoding="UTF-8", newline="") as file:
-                csv_file = csv.DictWriter(file, fieldnames=headers, lineterminator="\n")
-                csv_file.writeheader()
-                csv_file.writerows(versions.values())
-
-    def write_svg(self, today: str, out_path: str) -> None:
-        """Output SVG file."""
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader("_tools/"),
-            autoescape=True,
-            lstrip_blocks=True,
-            trim_blocks=True,
-            undefined=jinja2.StrictUndefined,
+            file = io.StringIO()
+            csv_file = csv.DictWriter(file, fieldnames=headers, lineterminator="\n")
+            csv_file.writeheader()
+            csv_file.writerows(versions.values())
+            outputs[f"include/{cat}.csv"] = file.getvalue()
+        return outputs
+
+    def render_svg(
+        self,
+        template: jinja2.Template,
+        today: str,
+        *,
+        precision: int | None = None,
+        embed_style: bool = True,
+    ) -> str:
+        """Return the contents of the SVG file.
+
+        With *precision*, coordinates are rounded to that many decimal places.
+        """
+        return template.render(
+            layout=layout_chart(
+                self.sorted_versions,
+                self.rows,
+                self.cutoff,
+                dt.date.fromisoformat(today),
+                self.scale,
+                precision,
+            ),
+            id_key=self.id_key,
+            embed_style=embed_style,
         )
-        template = env.get_template("release_cycle_template.svg.jinja")
-
-        # Scale. Should be roughly the pixel size of the font.
-        # All later sizes are multiplied by this, so you can think of all other
-        # numbers being multiples of the font size, like using `em` units in
-        # CSS.
-        # (Ideally we'd actually use `em` units, but SVG viewBox doesn't take
-        # those.)
-
-        # Uppercase sizes are un-scaled
-        SCALE = 18
-
-        # Width of the drawing and main parts
-        DIAGRAM_WIDTH = 46
-        LEGEND_WIDTH = 7
-        RIGHT_MARGIN = 0.5
-
-        # Height of one line. If you change this you'll need to tweak
-        # some positioning numbers in the template as well.
-        LINE_HEIGHT = 1.5
-
-        first_date = self.cutoff
-        last_date = max(ver["end_of_life_date"] for ver in self.sorted_versions)
-
-        def date_to_x(date: dt.date) -> float:
-            """Convert datetime.date to an SVG X coordinate"""
-            num_days = (date - first_date).days
-            total_days = (last_date - first_date).days
-            ratio = num_days / total_days
-            x = ratio * (DIAGRAM_WIDTH - LEGEND_WIDTH - RIGHT_MARGIN)
-            return (x + LEGEND_WIDTH) * SCALE
-
-        def year_to_x(year: int) -> float:
-            """Convert year number to an SVG X coordinate of 1st January"""
-            return date_to_x(dt.date(year, 1, 1))
-
-        def format_year(year: int) -> str:
-            """Format year number for display"""
-            return f"'{year % 100:02}"
-
-        with open(out_path, "w", encoding="UTF-8", newline="\n") as f:
-            template.stream(
-                SCALE=SCALE,
-                diagram_width=DIAGRAM_WIDTH * SCALE,
-                diagram_height=(self.sorted_versions[0]["y"] + 2) * LINE_HEIGHT * SCALE,
-                years=range(first_date.year, last_date.year + 1),
-                line_height=LINE_HEIGHT * SCALE,
-                legend_width=LEGEND_WIDTH * SCALE,
-                right_margin=RIGHT_MARGIN * SCALE,
-                versions=list(reversed(self.sorted_versions)),
-                today=dt.datetime.strptime(today, "%Y-%m-%d").date(),
-                year_to_x=year_to_x,
-                date_to_x=date_to_x,
-                format_year=format_year,
-                id_key=self.id_key,
-            ).dump(f)
+
+
+def minify_svg(svg: str) -> str:
+    """Strip comments and insignificant whitespace from an SVG document."""
+    svg = re.sub(r"<!--.*?-->", "", svg, flags=re.DOTALL)
+    svg = re.sub(
+        r"(<style>)(.*?)(</style>)",
+        lambda match: match[1] + minify_css(match[2]) + match[3],
+        svg,
+        flags=re.DOTALL,
+    )
+    svg = re.sub(r"\s+", " ", svg)
+    # Whitespace around tags, and around text (which SVG trims anyway)
+    svg = re.sub(r"\s*(/?>)\s*", r"\1", svg)
+    return re.sub(r"\s+<", "<", svg).strip() + "\n"
+
+
+def make_environment() -> jinja2.Environment:
+    """Return a Jinja environment that caches compiled templates on disk."""
+    bytecode_dir = CACHE_DIR / "jinja"
+    bytecode_dir.mkdir(parents=True, exist_ok=True)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE.parent),
+        autoescape=True,
+        lstrip_blocks=True,
+        trim_blocks=True,
+        undefined=jinja2.StrictUndefined,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(bytecode_dir),
+    )
+
+
+def render_charts(
+    cycle: ReleaseCycle,
+    variants: Iterable[ChartVariant],
+    today: str,
+    *,
+    template: jinja2.Template | None = None,
+    timings: Timings | None = None,
+    precision: int | None = None,
+    saved: dict[str, int] | None = None,
+) -> dict[str, str]:
+    """Render each variant, and return them keyed by output path.
+
+    The template is compiled once and shared by all the renders. They run one
+    after the other: rendering is CPU-bound, so threads wouldn't help. With
+    *precision*, the charts are compact: coordinates are rounded, the output
+    is minified, and see ChartVariant.page. The bytes saved by minifying
+    each chart and leaving out its stylesheet are then stored in *saved*, by
+    output path (not counting the rounding).
+    """
+    if template is None:
+        template = make_environment().get_template(TEMPLATE.name)
+    timings = timings or Timings()
+
+    variants = list(variants)
+    styled_pages = set()
+    embed_style = {}
+    for variant in variants:
+        embed_style[variant.id_key] = (
+            precision is None
+            or variant.page is None
+            or variant.page not in styled_pages
+        )
+        styled_pages.add(variant.page)
+
+    def render(variant: ChartVariant) -> str:
+        with timings(f"svg {variant.id_key}"):
+            svg = Versions(cycle, variant).render_svg(
+                template,
+                today,
+                precision=precision,
+                embed_style=embed_style[variant.id_key],
+            )
+            if precision is None:
+                return svg
+            compact = minify_svg(svg)
+            if saved is not None:
+                saved[variant.out_path] = len(svg.encode()) - len(compact.encode())
+            return compact
+
+    svgs = {variant.out_path: render(variant) for variant in variants}
+
+    if saved is not None and precision is not None:
+        styles = {}
+        for variant in variants:
+            if embed_style[variant.id_key] and (
+                style := re.search(r"<style>.*?</style>", svgs[variant.out_path])
+            ):
+                styles.setdefault(variant.page, len(style[0].encode()))
+        for variant in variants:
+            if not embed_style[variant.id_key]:
+                saved[variant.out_path] += styles.get(variant.page, 0)
+    return svgs
+
+
+class Timings:
+    """Record how long each stage of a run takes."""
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        # (name, start, duration, thread ID), in seconds since origin
+        self.spans: list[tuple[str, float, float, int]] = []
+
+    @contextmanager
+    def __call__(self, name: str) -> Generator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((
+                name,
+                start - self.origin,
+                end - start,
+                threading.get_ident(),
+            ))
+
+    def report(self, file: TextIO = sys.stderr) -> None:
+        """Print each stage's duration, in the order the stages started."""
+        total = time.perf_counter() - self.origin
+        print(f"Release cycle timings (total {total * 1000:.1f} ms):", file=file)
+        for name, _, duration, _ in sorted(self.spans, key=itemgetter(1)):
+            print(f"  {duration * 1000:9.2f} ms  {name}", file=file)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the stages in Chrome's Trace Event Format (chrome://tracing)."""
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": tid,
+            }
+            for name, start, duration, tid in self.spans
+        ]
+        Path(path).write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def inputs_digest(data: bytes, *settings: str) -> str:
+    """Hash everything the generated files depend on."""
+    parts = (
+        data,
+        *(source.read_bytes() for source in SOURCES),
+        *(setting.encode() for setting in settings),
+    )
+    return file_digest(b"".join(file_digest(part).encode() for part in parts))
+
+
+def read_manifest() -> dict[str, str | dict[str, str]]:
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def outputs_current(manifest: dict[str, str | dict[str, str]], digest: str) -> bool:
+    """Whether the manifest matches *digest* and every output is untouched."""
+    if manifest.get("inputs") != digest or not manifest.get("outputs"):
+        return False
+    try:
+        return all(
+            file_digest(Path(path).read_bytes()) == expected
+            for path, expected in manifest["outputs"].items()
+        )
+    except OSError:
+        return False
+
+
+def write_outputs(outputs: dict[str, str], digest: str) -> list[str]:
+    """Write the changed *outputs* and the manifest, returning what changed."""
+    # Unchanged files keep their mtimes, so Sphinx does not re-read the
+    # documents that include them
+    written = [
+        path
+        for path, text in outputs.items()
+        if write_if_changed(Path(path), text.encode("utf-8"))
+    ]
+    manifest = {
+        "inputs": digest,
+        "outputs": {
+            path: file_digest(text.encode("utf-8")) for path, text in outputs.items()
+        },
+    }
+    write_atomic(MANIFEST, json.dumps(manifest, indent=2).encode())
+    return written
 
 
 def main() -> None:
@@ -201,17 +457,207 @@ def main() -> None:
         metavar=" YYYY-MM-DD",
         help="Override today for testing",
     )
+    parser.add_argument(
+        "--input",
+        metavar="PATH",
+        help="Read release-cycle.json from a local file instead of the network",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use the last cached copy of release-cycle.json",
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        metavar="SECONDS",
+        help="Use a cached release-cycle.json younger than this without "
+        "revalidating it; None means $RELEASE_CYCLE_TTL or 3600",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Round SVG coordinates, strip whitespace and comments, and only "
+        "embed the stylesheet once per page",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=2,
+        metavar="DIGITS",
+        help="Decimal places to round SVG coordinates to with --compact",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Render even if the inputs have not changed since the last run",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, and regenerate the files whenever the template or "
+        "a local --input changes",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        metavar="SECONDS",
+        help="How often to check for changes with --watch",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print how long each stage took to stderr",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Write the stage timings as a Chrome trace (JSON) to PATH",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Run under cProfile and write pstats data to PATH",
+    )
     args = parser.parse_args()
 
-    versions = Versions()
-    assert len(versions.versions) > 10
+    if args.watch:
+        try:
+            watch(args)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    timings = Timings()
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(generate, args, timings)
+        profiler.dump_stats(args.profile)
+    else:
+        generate(args, timings)
+
+    if args.timings:
+        timings.report()
+    if args.trace:
+        timings.write_chrome_trace(args.trace)
+
+
+def generate(args: argparse.Namespace, timings: Timings) -> None:
+    with timings("fetch"):
+        raw = read_release_cycle(
+            source=args.input,
+            offline=args.offline or None,
+            ttl=args.ttl,
+        )
+    with timings("check manifest"):
+        digest = inputs_digest(raw, args.today, f"{args.compact} {args.precision}")
+        up_to_date = not args.force and outputs_current(read_manifest(), digest)
+    if up_to_date:
+        print("Release cycle files are up to date.")
+        return
+
+    with timings("decode JSON"):
+        data = json.loads(raw.decode("utf-8"))
+    with timings("build model"):
+        cycle = ReleaseCycle.from_json(data)
+    assert len(cycle.versions) > 10
     Path("include").mkdir(exist_ok=True)
 
-    versions.write_csv()
-    versions.write_svg(args.today, "_static/release-cycle-all.svg")
+    with timings("render CSV"):
+        outputs = Versions(cycle).render_csv(args.today)
+    with timings("compile template"):
+        template = make_environment().get_template(TEMPLATE.name)
+    precision = args.precision if args.compact else None
+    saved: dict[str, int] = {}
+    with timings("render SVG"):
+        svgs = render_charts(
+            cycle,
+            VARIANTS,
+            args.today,
+            template=template,
+            timings=timings,
+            precision=precision,
+            saved=saved,
+        )
+    outputs |= svgs
+    if args.compact:
+        after = sum(len(svg.encode()) for svg in svgs.values())
+        before = after + sum(saved.values())
+        print(
+            f"Compact SVGs: {after:,} bytes instead of at least {before:,} "
+            f"({1 - after / before:.0%} smaller, not counting the rounding)."
+        )
+
+    with timings("write files"):
+        written = write_outputs(outputs, digest)
+    print(
+        f"Release cycle data generated ({len(written)} of {len(outputs)} files changed)."
+    )
+
 
-    versions = Versions(limit_to_active=True, special_py27=True)
-    versions.write_svg(args.today, "_static/release-cycle.svg")
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def watch(args: argparse.Namespace) -> None:
+    """Regenerate the files whenever their inputs change, until interrupted.
+
+    The data and the compiled template stay in memory between changes, and
+    a change to the template only renders the charts again. Files are only
+    written if their contents change, so that tools watching them (such as
+    sphinx-autobuild) aren't triggered for nothing. release-cycle.json is
+    only watched when it is a local file, and changes to the Python code
+    need a restart.
+    """
+    source = args.input or os.getenv("RELEASE_CYCLE_JSON")
+    watched = [TEMPLATE, *([Path(source)] if source else [])]
+    settings = (args.today, f"{args.compact} {args.precision}")
+    precision = args.precision if args.compact else None
+    # Reloads the template when it changes
+    environment = make_environment()
+    Path("include").mkdir(exist_ok=True)
+
+    raw = cycle = None
+    outputs = {}
+    mtimes = {}
+    print(f"Watching {', '.join(map(str, watched))} (press Ctrl+C to stop)")
+    while True:
+        changed = [path for path in watched if _mtime(path) != mtimes.get(path)]
+        if not changed:
+            time.sleep(args.interval)
+            continue
+        mtimes |= {path: _mtime(path) for path in changed}
+
+        start = time.perf_counter()
+        try:
+            if raw is None or (source and Path(source) in changed):
+                new_raw = read_release_cycle(
+                    source=args.input, offline=args.offline or None, ttl=args.ttl
+                )
+                if new_raw != raw:
+                    cycle = ReleaseCycle.from_json(json.loads(new_raw.decode("utf-8")))
+                    raw = new_raw
+                    outputs |= Versions(cycle).render_csv(args.today)
+            outputs |= render_charts(
+                cycle,
+                VARIANTS,
+                args.today,
+                template=environment.get_template(TEMPLATE.name),
+                precision=precision,
+            )
+            written = write_outputs(outputs, inputs_digest(raw, *settings))
+        except (OSError, ValueError, KeyError, jinja2.TemplateError) as err:
+            print(f"Error: {err}", file=sys.stderr)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"{', '.join(path.name for path in changed)} changed: "
+            f"{len(written)} of {len(outputs)} files written in {elapsed:.0f} ms"
+        )
 
 
 if __name__ == "__main__":
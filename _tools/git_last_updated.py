@@ -0,0 +1,201 @@
+"""Sphinx extension: date each page by the last commit that changed it.
+
+One ``git log --name-only`` walk finds the time of the last commit touching
+every path in the repository. The result is kept in
+``_build/.cache/git-last-updated.json`` together with the commit it was made
+at. When HEAD moves forward, only the new commits are read to update it.
+
+A page's date is that of its source file or of any file it includes,
+whichever changed last, formatted with ``html_last_updated_fmt``. Pages with
+no committed history get no date. Pages whose date changed since the last
+build are rebuilt.
+
+In a shallow clone, the oldest commits fetched list every file in the tree,
+as if they had added them. Files not changed since then get no date rather
+than the date of those commits.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from http_cache import CACHE_DIR, write_atomic
+from sphinx.util import logging
+from sphinx.util.i18n import format_date
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+INDEX = CACHE_DIR / "git-last-updated.json"
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "core.quotePath=false", *args],
+        cwd=cwd,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+
+def shallow_commits(cwd: Path) -> list[str]:
+    """Return the commits at the boundary of a shallow clone, if it is one."""
+    path = cwd / _git(cwd, "rev-parse", "--git-path", "shallow").strip()
+    try:
+        return sorted(path.read_text(encoding="ascii").split())
+    except FileNotFoundError:
+        return []
+
+
+def read_log(
+    cwd: Path, *revisions: str, shallow: Collection[str] = ()
+) -> dict[str, int]:
+    """Return the time of the newest commit in *revisions* to touch each path.
+
+    The paths of the *shallow* boundary commits are left out, as their parents
+    are missing and they appear to add every file.
+    """
+    times: dict[str, int] = {}
+    timestamp = None
+    for line in _git(
+        cwd, "log", "--format=%x00%H %ct", "--name-only", *revisions
+    ).splitlines():
+        if line.startswith("\0"):
+            commit, _, time = line[1:].partition(" ")
+            timestamp = None if commit in shallow else int(time)
+        elif line and timestamp is not None:
+            # Newest commits come first
+            times.setdefault(line, timestamp)
+    return times
+
+
+def load_index(cwd: Path) -> tuple[Path, dict[str, int]]:
+    """Return the repository root and the last-commit time of each path in it."""
+    toplevel, head = _git(cwd, "rev-parse", "--show-toplevel", "HEAD").splitlines()
+    shallow = shallow_commits(cwd)
+    try:
+        index = json.loads(INDEX.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        index = {}
+
+    # Fetching more history changes the dates of files older than the boundary
+    same_repo = (
+        index.get("toplevel") == toplevel and index.get("shallow", []) == shallow
+    )
+    if same_repo and index.get("head") == head:
+        return Path(toplevel), index["times"]
+
+    previous = index.get("head") if same_repo else None
+    if previous:
+        is_ancestor = subprocess.run(
+            ["git", "merge-base", "--is-ancestor", previous, head],
+            cwd=cwd,
+            capture_output=True,
+            check=False,
+        )
+        if is_ancestor.returncode != 0:
+            previous = None
+    if previous:
+        times = index["times"] | read_log(cwd, f"{previous}..{head}", shallow=shallow)
+    else:
+        times = read_log(cwd, head, shallow=shallow)
+    if shallow and not previous:
+        logger.info(
+            "shallow clone: pages not changed since the oldest commit fetched "
+            "get no last-updated date"
+        )
+
+    write_atomic(
+        INDEX,
+        json.dumps({
+            "toplevel": toplevel,
+            "head": head,
+            "shallow": shallow,
+            "times": times,
+        }).encode(),
+    )
+    return Path(toplevel), times
+
+
+def _last_updated(app: Sphinx, env: BuildEnvironment, docname: str) -> int | None:
+    toplevel, times = app._git_last_updated_index
+    found = []
+    for path in (env.doc2path(docname), *env.dependencies.get(docname, ())):
+        try:
+            key = (env.srcdir / path).resolve().relative_to(toplevel).as_posix()
+        except ValueError:
+            # Outside the repository
+            continue
+        if key in times:
+            found.append(times[key])
+    return max(found, default=None)
+
+
+def _find_outdated(
+    app: Sphinx,
+    env: BuildEnvironment,
+    added: set[str],
+    changed: set[str],
+    removed: set[str],
+) -> list[str]:
+    try:
+        app._git_last_updated_index = load_index(app.srcdir)
+    except (OSError, subprocess.CalledProcessError) as err:
+        logger.warning("cannot read the git history: %s", err)
+        app._git_last_updated_index = (app.srcdir, {})
+
+    previous = getattr(env, "git_last_updated", {})
+    _record_dates(app, env)
+    return [
+        docname
+        for docname, timestamp in env.git_last_updated.items()
+        if docname in previous and previous[docname] != timestamp
+    ]
+
+
+def _record_dates(app: Sphinx, env: BuildEnvironment) -> None:
+    # Recorded again once the sources have been read, as the files they
+    # include may have changed
+    env.git_last_updated = {
+        docname: _last_updated(app, env, docname) for docname in env.found_docs
+    }
+
+
+def _page_context(
+    app: Sphinx,
+    pagename: str,
+    templatename: str,
+    context: dict[str, object],
+    doctree: object,
+) -> None:
+    config = app.config
+    if config.html_last_updated_fmt is None or pagename not in app.env.found_docs:
+        return
+    timestamp = _last_updated(app, app.env, pagename)
+    if timestamp is None:
+        context["last_updated"] = None
+        return
+    context["last_updated"] = format_date(
+        config.html_last_updated_fmt or "%b %d, %Y",
+        date=dt.datetime.fromtimestamp(timestamp, tz=dt.timezone.utc),
+        language=config.language,
+        local_time=not config.html_last_updated_use_utc,
+    )
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.connect("env-get-outdated", _find_outdated)
+    app.connect("env-updated", _record_dates)
+    app.connect("html-page-context", _page_context)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
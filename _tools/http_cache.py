@@ -0,0 +1,133 @@
+"""Persistent on-disk cache for HTTP downloads, revalidated with conditional GETs."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+# Shared by everything that caches build inputs. Dot-prefixed so that
+# ``make clean`` (which removes ``_build/*``) keeps it.
+CACHE_DIR = Path(
+    os.getenv("DEVGUIDE_CACHE_DIR")
+    or Path(__file__).resolve().parent.parent / "_build" / ".cache"
+)
+
+
+def _meta_path(cache_file: Path) -> Path:
+    return cache_file.with_name(cache_file.name + ".meta.json")
+
+
+def read_meta(cache_file: Path) -> dict[str, str | float]:
+    """Return the stored validators for *cache_file*, or {} if not cached."""
+    try:
+        meta = json.loads(_meta_path(cache_file).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return meta if cache_file.is_file() else {}
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Write *data* to *path* unless it already has exactly these contents.
+
+    Leaving unchanged files alone keeps their mtimes, so that Sphinx and web
+    caches don't see them as changed. Files are replaced atomically, so that
+    readers never see a partly written one. Return whether it was written.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    write_atomic(path, data)
+    return True
+
+
+def _write_meta(cache_file: Path, meta: dict[str, str | float]) -> None:
+    write_atomic(_meta_path(cache_file), json.dumps(meta, indent=2).encode())
+
+
+def fetch(
+    url: str,
+    cache_file: Path,
+    *,
+    ttl: float = 3600,
+    offline: bool = False,
+    timeout: float = 30,
+) -> bytes:
+    """Return the body of *url*, using *cache_file* to avoid refetching.
+
+    A cached copy younger than *ttl* seconds is used as-is. An older copy is
+    revalidated with ``If-None-Match``/``If-Modified-Since``, and is used as a
+    fallback if the network is unreachable. With *offline*, the network is
+    never touched and a missing cache is an error.
+    """
+    meta = read_meta(cache_file)
+
+    if offline:
+        if not meta:
+            msg = f"Offline mode, but {url} has never been cached in {cache_file}"
+            raise FileNotFoundError(msg)
+        return cache_file.read_bytes()
+
+    if meta and time.time() - meta["fetched"] < ttl:
+        return cache_file.read_bytes()
+
+    try:
+        data, validators = conditional_get(url, meta, timeout=timeout)
+    except (URLError, OSError) as err:
+        if not meta:
+            raise
+        logger.warning("Fetching %s failed (%s), using cached copy", url, err)
+        return cache_file.read_bytes()
+
+    if data is None:
+        data = cache_file.read_bytes()
+    else:
+        write_atomic(cache_file, data)
+    _write_meta(cache_file, {"url": url, **validators})
+    return data
+
+
+def conditional_get(
+    url: str, validators: dict[str, str | float], *, timeout: float = 30
+) -> tuple[bytes | None, dict[str, str | float]]:
+    """GET *url*, revalidating a copy described by *validators*.
+
+    Return the body, or None if the server says the copy is still current,
+    together with the validators to store for next time. Network and HTTP
+    errors are raised.
+    """
+    request = Request(url)
+    if validators.get("etag"):
+        request.add_header("If-None-Match", validators["etag"])
+    if validators.get("last_modified"):
+        request.add_header("If-Modified-Since", validators["last_modified"])
+
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            headers = response.headers
+    except HTTPError as err:
+        if err.code != 304 or not validators:
+            raise
+        return None, {**validators, "fetched": time.time()}
+
+    return data, {
+        "etag": headers.get("ETag", ""),
+        "last_modified": headers.get("Last-Modified", ""),
+        "fetched": time.time(),
+    }
@@ -0,0 +1,152 @@
+"""Sphinx extension: keep intersphinx inventories in a persistent disk cache.
+
+Inventories are stored under ``_build/.cache/intersphinx/``, named by the
+SHA-256 of their contents, with an index of the URL each came from and its
+ETag/Last-Modified validators. This cache survives ``make clean``.
+
+Whenever intersphinx would download an inventory, the cached copy is used
+instead if it is younger than ``intersphinx_disk_cache_ttl`` seconds.
+Otherwise it is revalidated with a conditional request, and still used if
+the network is unreachable. With ``intersphinx_offline``, the network is
+never used. If there is no cached copy at all, ``<name>.inv`` in
+``intersphinx_fallback_dir`` (relative to the configuration directory) is
+used, if it exists; failing that, offline builds go without the project.
+
+Only projects whose inventory location is the default (None) are affected.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import posixpath
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.error import URLError
+
+from http_cache import CACHE_DIR, conditional_get, write_atomic
+from sphinx.ext.intersphinx import InventoryAdapter
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+STORE = CACHE_DIR / "intersphinx"
+INDEX = STORE / "index.json"
+
+
+def _read_index() -> dict[str, dict[str, str | float]]:
+    try:
+        return json.loads(INDEX.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(index: dict[str, dict[str, str | float]]) -> None:
+    write_atomic(INDEX, json.dumps(index, indent=2).encode())
+    # Drop inventories that no URL refers to any more
+    current = {f"{entry['sha256']}.inv" for entry in index.values()}
+    for path in STORE.glob("*.inv"):
+        if path.name not in current:
+            path.unlink(missing_ok=True)
+
+
+def cached_inventory(
+    url: str, *, ttl: float, offline: bool, timeout: float | None
+) -> Path | None:
+    """Return the path of a cached copy of the inventory at *url*, or None."""
+    index = _read_index()
+    entry = index.get(url, {})
+    path = STORE / f"{entry.get('sha256')}.inv"
+    if entry and not path.is_file():
+        entry = {}
+
+    if offline or (entry and time.time() - entry["fetched"] < ttl):
+        return path if entry else None
+
+    try:
+        data, validators = conditional_get(url, entry, timeout=timeout or 30)
+    except (URLError, OSError) as err:
+        if entry:
+            logger.warning(
+                "fetching intersphinx inventory %s failed (%s), using cached copy",
+                url,
+                err,
+            )
+            return path
+        return None
+
+    if data is None:
+        validators["sha256"] = entry["sha256"]
+    else:
+        validators["sha256"] = hashlib.sha256(data).hexdigest()
+        path = STORE / f"{validators['sha256']}.inv"
+        if not path.is_file():
+            write_atomic(path, data)
+    index[url] = validators
+    _write_index(index)
+    return path
+
+
+def _use_cached_inventories(app: Sphinx) -> None:
+    """Point intersphinx at local copies of the inventories it would fetch.
+
+    The original mapping is restored by _restore_mapping() once intersphinx
+    has loaded them, so the environment never sees a changed configuration.
+    """
+    config = app.config
+    mapping = config.intersphinx_mapping
+    app._intersphinx_cache_mapping = dict(mapping)
+
+    if config.intersphinx_cache_limit >= 0:
+        expiry = time.time() - config.intersphinx_cache_limit * 86400
+    else:
+        expiry = 0
+    loaded = InventoryAdapter(app.env).cache
+
+    for key, (name, (uri, locations)) in list(mapping.items()):
+        if locations != (None,) or "://" not in uri:
+            continue
+        if uri in loaded and loaded[uri][1] >= expiry:
+            # Still fresh in the environment: intersphinx won't fetch it
+            continue
+
+        path = cached_inventory(
+            posixpath.join(uri, "objects.inv"),
+            ttl=config.intersphinx_disk_cache_ttl,
+            offline=config.intersphinx_offline,
+            timeout=config.intersphinx_timeout,
+        )
+        if path is None and config.intersphinx_fallback_dir:
+            fallback = Path(app.confdir, config.intersphinx_fallback_dir, f"{name}.inv")
+            if fallback.is_file():
+                path = fallback
+        if path is not None:
+            mapping[key] = (name, (uri, (str(path),)))
+        elif config.intersphinx_offline:
+            logger.warning("no cached intersphinx inventory for %s, skipping it", uri)
+            del mapping[key]
+
+
+def _restore_mapping(app: Sphinx) -> None:
+    app.config.intersphinx_mapping = app._intersphinx_cache_mapping
+    del app._intersphinx_cache_mapping
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.setup_extension("sphinx.ext.intersphinx")
+    app.add_config_value("intersphinx_disk_cache_ttl", 86400, "", types=(int, float))
+    app.add_config_value(
+        "intersphinx_offline", bool(os.getenv("INTERSPHINX_OFFLINE")), "", types=(bool,)
+    )
+    app.add_config_value("intersphinx_fallback_dir", None, "", types=(str, type(None)))
+    # intersphinx loads its inventories in a 'builder-inited' handler with
+    # the default priority of 500
+    app.connect("builder-inited", _use_cached_inventories, priority=400)
+    app.connect("builder-inited", _restore_mapping, priority=600)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
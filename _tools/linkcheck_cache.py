@@ -0,0 +1,243 @@
+"""Sphinx extension: make ``linkcheck`` remember its results between runs.
+
+This replaces the ``linkcheck`` builder with one that stores every external
+link found to work (status, redirect target, and when it was checked) in
+``_build/.cache/linkcheck.json``. This cache survives ``make clean``. Links
+found to work less than ``linkcheck_cache_ttl`` seconds ago are reported from
+the cache instead of being checked again. Broken links and timeouts aren't
+stored, as they're always checked again. Changing the options that affect
+the outcome of a check (anchors, allowed redirects, request headers)
+discards the cache.
+
+``linkcheck_host_limits`` maps host names to the number of requests that may
+be in flight to that host at once, and the minimum number of seconds between
+two requests to it. A worker thread waits for its turn before checking a link
+to a limited host, while the other workers carry on. On top of this, Sphinx's
+own exponential backoff still applies when a host answers "429 Too Many
+Requests".
+
+The builder only needs an HTTP server to talk to, and
+``_tools/test_linkcheck_cache.py`` runs it against a local one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from http_cache import CACHE_DIR, write_atomic
+from sphinx.builders.linkcheck import (
+    CheckExternalLinksBuilder,
+    CheckResult,
+    HyperlinkAvailabilityChecker,
+    HyperlinkAvailabilityCheckWorker,
+)
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+    from typing import Any
+
+    from sphinx.application import Sphinx
+    from sphinx.config import Config
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = CACHE_DIR / "linkcheck.json"
+
+# The values of sphinx.builders.linkcheck._Status for the results to remember
+CACHED_STATUSES = frozenset({"working", "redirected"})
+
+
+def _config_digest(config: Config) -> str:
+    """Return a digest of the options that can change the result of a check."""
+    redirects = config.linkcheck_allowed_redirects
+    if isinstance(redirects, dict):
+        redirects = sorted(
+            (source.pattern, target.pattern) for source, target in redirects.items()
+        )
+    else:
+        redirects = None
+    options = {
+        "anchors": config.linkcheck_anchors,
+        "anchors_ignore": list(config.linkcheck_anchors_ignore),
+        "anchors_ignore_for_url": list(config.linkcheck_anchors_ignore_for_url),
+        "allowed_redirects": redirects,
+        "allow_unauthorized": config.linkcheck_allow_unauthorized,
+        "request_headers": config.linkcheck_request_headers,
+    }
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+def read_cache(digest: str) -> dict[str, dict[str, str | int | float]]:
+    """Return the cached results by URL, or {} if they were made differently."""
+    try:
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if cache.get("config") != digest:
+        return {}
+    # Older caches also held broken links
+    return {
+        uri: entry
+        for uri, entry in cache["results"].items()
+        if entry.get("status") in CACHED_STATUSES
+    }
+
+
+def write_cache(digest: str, results: dict[str, dict[str, str | int | float]]) -> None:
+    cache = {"config": digest, "results": results}
+    write_atomic(CACHE_FILE, json.dumps(cache, indent=1, sort_keys=True).encode())
+
+
+class HostLimits:
+    """Per-host concurrency and request spacing, shared by all the workers."""
+
+    def __init__(self, limits: dict[str, tuple[int, float]]) -> None:
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._slots = {
+            host: threading.BoundedSemaphore(max_requests)
+            for host, (max_requests, _interval) in limits.items()
+        }
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str) -> Generator[None]:
+        """Wait until a request to *host* may start, and hold it until done."""
+        if host not in self.limits:
+            yield
+            return
+        with self._slots[host]:
+            with self._lock:
+                start = max(time.monotonic(), self._next_start.get(host, 0))
+                self._next_start[host] = start + self.limits[host][1]
+            time.sleep(max(0.0, start - time.monotonic()))
+            yield
+
+
+class HostLimitedWorker(HyperlinkAvailabilityCheckWorker):
+    """A worker that waits for a free slot before contacting a limited host."""
+
+    def __init__(self, *args: Any, host_limits: HostLimits) -> None:
+        self.host_limits = host_limits
+        super().__init__(*args)
+
+    def _check(self, docname: str, uri: str, *args: Any) -> Any:
+        with self.host_limits.slot(urlsplit(uri).netloc):
+            return super()._check(docname, uri, *args)
+
+
+class HostLimitedChecker(HyperlinkAvailabilityChecker):
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        self.host_limits = HostLimits({
+            host: (max(1, int(requests)), float(interval))
+            for host, (requests, interval) in config.linkcheck_host_limits.items()
+        })
+
+    def invoke_threads(self) -> None:
+        for _i in range(self.num_workers):
+            thread = HostLimitedWorker(
+                self.config,
+                self.rqueue,
+                self.wqueue,
+                self.rate_limits,
+                host_limits=self.host_limits,
+            )
+            thread.start()
+            self.workers.append(thread)
+
+
+class CachedLinkcheckBuilder(CheckExternalLinksBuilder):
+    """Checks for broken external links, skipping recently checked ones."""
+
+    def finish(self) -> None:
+        # As CheckExternalLinksBuilder.finish(), but through the cache
+        digest = _config_digest(self.config)
+        self.link_cache = read_cache(digest)
+        logger.info("")
+
+        output_text = self.outdir / "output.txt"
+        output_json = self.outdir / "output.json"
+        try:
+            with (
+                open(output_text, "w", encoding="utf-8") as self.txt_outfile,
+                open(output_json, "w", encoding="utf-8") as self.json_outfile,
+            ):
+                for result in self.check_hyperlinks():
+                    self.process_result(result)
+        finally:
+            # Also keep the progress of an interrupted run
+            write_cache(digest, self.link_cache)
+
+        if self.broken_hyperlinks or self.timed_out_hyperlinks:
+            self._app.statuscode = 1
+
+    def check_hyperlinks(self) -> Iterator[CheckResult]:
+        """Yield a result for every hyperlink, from the cache if possible."""
+        expiry = time.time() - self.config.linkcheck_cache_ttl
+        checker = HostLimitedChecker(self.config)
+        to_check = {}
+        cached = 0
+        for uri, hyperlink in self.hyperlinks.items():
+            entry = self.link_cache.get(uri)
+            if (
+                entry
+                and entry["status"] in CACHED_STATUSES
+                and entry["checked"] >= expiry
+                and not checker.is_ignored_uri(uri)
+            ):
+                cached += 1
+                yield CheckResult(
+                    uri,
+                    hyperlink.docname,
+                    hyperlink.lineno,
+                    entry["status"],
+                    entry["message"],
+                    entry["code"],
+                )
+            else:
+                to_check[uri] = hyperlink
+        if cached:
+            logger.info(
+                "%d of %d links were checked less than %s seconds ago, "
+                "using the results in %s",
+                cached,
+                len(self.hyperlinks),
+                self.config.linkcheck_cache_ttl,
+                CACHE_FILE,
+            )
+
+        for result in checker.check(to_check):
+            scheme = urlsplit(result.uri).scheme
+            if result.status in CACHED_STATUSES and scheme in {"http", "https"}:
+                self.link_cache[result.uri] = self._cache_entry(result)
+            else:
+                # Such as a link that used to work
+                self.link_cache.pop(result.uri, None)
+            yield result
+
+    @staticmethod
+    def _cache_entry(result: CheckResult) -> dict[str, str | int | float]:
+        return {
+            "status": str(result.status),
+            "code": result.code,
+            # The redirect target, if any
+            "message": result.message,
+            "checked": time.time(),
+        }
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.setup_extension("sphinx.builders.linkcheck")
+    app.add_builder(CachedLinkcheckBuilder, override=True)
+    app.add_config_value("linkcheck_cache_ttl", 86400, "", types=(int, float))
+    app.add_config_value("linkcheck_host_limits", {}, "", types=(dict,))
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
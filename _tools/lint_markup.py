@@ -0,0 +1,173 @@
+"""Run sphinx-lint, only on the files that changed since the last run.
+
+The errors found in each file are kept in ``_build/.cache/sphinx-lint.json``,
+under the SHA-256 of the file's contents. A file with the same contents as
+when it was last linted isn't linted again, as long as the sphinx-lint
+version and the enabled checkers and options are the same. Everything else is
+linted in parallel, as with sphinx-lint.
+
+Options are those of sphinx-lint, plus:
+
+``--changed-since REV``
+    Only lint the files changed between REV and HEAD, or not committed yet.
+``--no-cache``
+    Neither read nor update the cache.
+
+For example, ``make check CHECK_OPTS="--changed-since main"``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from itertools import chain, starmap
+from pathlib import Path
+
+from changed_pages import changed_files
+from http_cache import CACHE_DIR, write_atomic
+from sphinxlint import __version__, check_file, cli
+from sphinxlint.sphinxlint import CheckersOptions, LintError
+
+CACHE_FILE = CACHE_DIR / "sphinx-lint.json"
+# Below this many files to lint, don't start a pool of processes
+MIN_PARALLEL = 8
+
+
+def _config_digest(checkers: set, options: CheckersOptions) -> str:
+    """Return a digest of what, besides a file, affects the errors in it."""
+    config = {
+        "version": __version__,
+        "checkers": sorted(checker.name for checker in checkers),
+        "max_line_length": options.max_line_length,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def read_cache(digest: str) -> dict[str, dict]:
+    """Return the cached results for the configuration *digest*."""
+    try:
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache["files"] if cache.get("config") == digest else {}
+
+
+def write_cache(digest: str, files: dict[str, dict]) -> None:
+    files = {path: entry for path, entry in files.items() if os.path.exists(path)}
+    write_atomic(
+        CACHE_FILE,
+        json.dumps({"config": digest, "files": files}, sort_keys=True).encode(),
+    )
+
+
+def _file_hash(path: str) -> str | None:
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _check_file(todo: tuple) -> list:
+    return check_file(*todo)
+
+
+def lint(paths: list[str], checkers: set, options: CheckersOptions, jobs: int):
+    """Return the errors in each of *paths*, in the same order."""
+    todo = [(path, checkers, options) for path in paths]
+    if jobs == 1 or len(todo) < MIN_PARALLEL:
+        return list(starmap(check_file, todo))
+    with multiprocessing.Pool(processes=jobs) as pool:
+        return pool.map(_check_file, todo, chunksize=4)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        add_help=False,
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REV",
+        help="Only lint the files changed since REV, or not committed yet",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Don't read or update the cache"
+    )
+    own_args, sphinx_lint_args = parser.parse_known_args()
+    if {"-h", "--help"} & set(sphinx_lint_args):
+        # Followed by the help of sphinx-lint's options
+        parser.print_help()
+        print()
+    argv = [sys.argv[0], *sphinx_lint_args]
+    checkers, args = cli.parse_args(argv)
+    if args.list:
+        return cli.main(argv)
+    options = CheckersOptions.from_argparse(args)
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"Error: path {path} does not exist", file=sys.stderr)
+            return 2
+    # Files of other types are skipped by sphinx-lint without reading them
+    suffixes = set(chain.from_iterable(checker.suffixes for checker in checkers))
+    paths = [
+        path
+        for path in chain.from_iterable(
+            cli.walk(path, args.ignore) for path in args.paths
+        )
+        if os.path.splitext(path)[1] in suffixes
+    ]
+    if own_args.changed_since:
+        changed = {
+            os.path.realpath(path) for path in changed_files(own_args.changed_since)
+        }
+        paths = [path for path in paths if os.path.realpath(path) in changed]
+
+    digest = _config_digest(checkers, options)
+    cache = {} if own_args.no_cache else read_cache(digest)
+    results: dict[str, list] = {}
+    hashes: dict[str, str | None] = {}
+    for path in paths:
+        key = os.path.realpath(path)
+        hashes[path] = _file_hash(path)
+        entry = cache.get(key)
+        if entry and hashes[path] is not None and entry["hash"] == hashes[path]:
+            results[path] = [LintError(path, *error) for error in entry["errors"]]
+
+    stale = [path for path in paths if path not in results]
+    for path, errors in zip(
+        stale, lint(stale, checkers, options, args.jobs), strict=True
+    ):
+        results[path] = list(errors)
+        # Errors reading the file are plain strings, and not cached
+        if hashes[path] is not None and all(
+            isinstance(error, LintError) for error in results[path]
+        ):
+            cache[os.path.realpath(path)] = {
+                "hash": hashes[path],
+                "errors": [
+                    [error.line_no, error.msg, error.checker_name]
+                    for error in results[path]
+                ],
+            }
+
+    if not own_args.no_cache and stale:
+        write_cache(digest, cache)
+    if args.verbose:
+        print(
+            f"{len(stale)} files linted, {len(paths) - len(stale)} unchanged",
+            file=sys.stderr,
+        )
+    count = cli.print_errors(
+        cli.sort_errors((results[path] for path in paths), args.sort_by)
+    )
+    return int(bool(count))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
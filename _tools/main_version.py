@@ -0,0 +1,120 @@
+"""Sphinx extension: the version of Python on the ``main`` branch.
+
+``conf.py`` defines ``|main_version|`` in ``rst_prolog`` with the
+``main-version`` directive, which only leaves a placeholder in the pages
+using it. The placeholders are replaced when the pages are resolved for
+writing, with the version of the one entry of release-cycle.json with
+``"branch": "main"``, which is read through the cache described in
+_tools/release_cycle_data.py.
+
+So the version isn't part of the configuration, and a new one doesn't make
+Sphinx read every page again: the pages that use it are only written again.
+If release-cycle.json can't be loaded, the version from the previous build
+is used.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from docutils import nodes
+from release_cycle_data import load_release_cycle
+from sphinx.errors import ExtensionError
+from sphinx.transforms.post_transforms import SphinxPostTransform
+from sphinx.util import logging
+from sphinx.util.docutils import SphinxDirective
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class main_version(nodes.Inline, nodes.TextElement):
+    """Placeholder for the version of Python on the main branch."""
+
+
+class MainVersion(SphinxDirective):
+    """Insert the version of Python on the main branch.
+
+    Meant for substitution definitions: ``.. |main_version| main-version::``
+    """
+
+    def run(self) -> list[nodes.Node]:
+        return [main_version()]
+
+
+class ReplaceMainVersion(SphinxPostTransform):
+    default_priority = 100
+
+    def run(self, **kwargs) -> None:
+        version = self.app._main_version
+        for node in list(self.document.findall(main_version)):
+            node.replace_self(nodes.Text(version))
+
+
+def _docs(env: BuildEnvironment) -> set[str]:
+    """Return the names of the documents using the main version."""
+    if not hasattr(env, "main_version_docs"):
+        env.main_version_docs = set()
+    return env.main_version_docs
+
+
+def _load_version(app: Sphinx) -> None:
+    try:
+        cycle = load_release_cycle()
+    except (OSError, ValueError) as err:
+        previous = getattr(app.env, "main_version", None)
+        if previous is None:
+            msg = f"cannot load release-cycle.json: {err}"
+            raise ExtensionError(msg) from err
+        logger.warning(
+            "cannot load release-cycle.json (%s), using main version %s",
+            err,
+            previous,
+        )
+        app._main_version = previous
+        return
+    app._main_version = next(
+        version for version, data in cycle.items() if data.get("branch") == "main"
+    )
+
+
+def _note_usage(app: Sphinx, doctree: nodes.document) -> None:
+    # The definition in rst_prolog is in every document, so look for uses
+    for node in doctree.findall(main_version):
+        if not isinstance(node.parent, nodes.substitution_definition):
+            _docs(app.env).add(app.env.docname)
+            return
+
+
+def _purge(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    _docs(env).discard(docname)
+
+
+def _merge(
+    app: Sphinx, env: BuildEnvironment, docnames: set[str], other: BuildEnvironment
+) -> None:
+    _docs(env).update(_docs(other) & docnames)
+
+
+def _outdated_by_version(app: Sphinx, env: BuildEnvironment) -> list[str]:
+    """Return the documents to write again because the version changed."""
+    if getattr(env, "main_version", None) == app._main_version:
+        return []
+    env.main_version = app._main_version
+    return sorted(_docs(env))
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.add_node(main_version)
+    app.add_directive("main-version", MainVersion)
+    app.add_post_transform(ReplaceMainVersion)
+    app.connect("builder-inited", _load_version)
+    app.connect("doctree-read", _note_usage)
+    app.connect("env-purge-doc", _purge)
+    app.connect("env-merge-info", _merge)
+    app.connect("env-updated", _outdated_by_version)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
@@ -0,0 +1,297 @@
+"""Optimise the output of the html or dirhtml builder for serving.
+
+This rewrites the output directory in place:
+
+1. HTML is minified by collapsing whitespace and dropping comments, except in
+   ``<pre>``, ``<textarea>``, ``<script>`` and ``<style>`` elements. CSS files
+   that aren't minified yet have comments and whitespace removed. Of the
+   JavaScript, only the devguide's own scripts from ``_static/`` are
+   minified, by dropping indentation and comment lines: this isn't a real
+   parser, so the scripts of Sphinx and the theme are left alone.
+2. The stylesheets, scripts, images and fonts in ``_static/`` are renamed to
+   include a hash of their contents, such as ``furo.0a1b2c3d.css``, and the
+   references to them in HTML and CSS files are rewritten, so that they can
+   be served with immutable cache headers.
+3. Text files get a gzipped copy next to them, such as ``index.html.gz``,
+   for web servers serving precompressed files. It is left out if it
+   wouldn't be smaller.
+
+Files are processed in parallel, and the number of bytes saved is reported:
+
+    python _tools/optimize_output.py _build/html
+
+It can be run again after an incremental build: the files Sphinx wrote again
+are optimised, and those already optimised end up the same. Assets renamed
+in earlier runs are left in place, for pages cached with their old names.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Scripts written for the devguide, known to be safe to minify line by line
+OWN_SCRIPTS = frozenset(
+    path.relative_to(ROOT).as_posix() for path in (ROOT / "_static").rglob("*.js")
+)
+
+HASHED_SUFFIXES = frozenset({
+    ".css",
+    ".js",
+    ".png",
+    ".jpg",
+    ".gif",
+    ".svg",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".ttf",
+})
+GZIP_SUFFIXES = frozenset({".html", ".css", ".js", ".svg", ".json", ".txt", ".xml"})
+# Lines longer than this on average are taken to be minified already
+MINIFIED_LINE_LENGTH = 200
+
+# Names such as furo.0a1b2c3d.css, from an earlier run
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8}\.\w+$")
+# References in HTML, with the cache-busting query string Sphinx adds
+STATIC_REFERENCE = re.compile(r"(?<![\w.-])(_static/[^\"'\s?#)<>]+)(\?v=[0-9a-f]+)?")
+CSS_URL = re.compile(r"url\(\s*([\"']?)([^\"')]+)\1\s*\)")
+
+PRESERVED_HTML = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE
+)
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+CSS_TOKEN = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)""", re.DOTALL
+)
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*|(?<=:)\s+")
+
+
+def _whitespace(match: re.Match[str]) -> str:
+    return "\n" if "\n" in match.group() else " "
+
+
+def minify_html(text: str) -> str:
+    parts = PRESERVED_HTML.split(text)
+    # split() returns the text between the elements, each element, and the
+    # name of the element
+    for i in range(0, len(parts), 3):
+        parts[i] = re.sub(r"\s+", _whitespace, HTML_COMMENT.sub("", parts[i]))
+    del parts[2::3]
+    return "".join(parts).strip() + "\n"
+
+
+def minify_css(text: str) -> str:
+    """Strip comments and whitespace from a stylesheet, keeping its strings.
+
+    Also used for the stylesheets in the release-cycle SVGs.
+    """
+
+    def token(match: re.Match[str]) -> str:
+        string, comment, _space = match.groups()
+        if string:
+            return string
+        if comment:
+            # Keep licences and source maps
+            return comment if comment.startswith(("/*!", "/*#")) else ""
+        return " "
+
+    text = CSS_TOKEN.sub(token, text)
+    # Strings were kept as they are, so only strip outside of them
+    parts = re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", text)
+    parts[::2] = [
+        CSS_PUNCTUATION.sub(lambda m: m.group(1) or "", part).replace(";}", "}")
+        for part in parts[::2]
+    ]
+    return "".join(parts).strip() + "\n"
+
+
+def minify_js(text: str) -> str:
+    lines = text.splitlines()
+    if any(line.count("`") % 2 for line in lines):
+        # A template literal may span lines, where whitespace matters
+        return text
+    kept = [line.strip() for line in lines]
+    return "\n".join(line for line in kept if line and not line.startswith("//")) + "\n"
+
+
+MINIFIERS = {".html": minify_html, ".css": minify_css, ".js": minify_js}
+
+
+def _is_minified(text: str) -> bool:
+    lines = text.count("\n") + 1
+    return len(text) / lines > MINIFIED_LINE_LENGTH
+
+
+def minify(path: Path) -> tuple[int, int]:
+    """Minify *path* in place, returning its size before and after."""
+    data = path.read_bytes()
+    text = data.decode("utf-8")
+    if path.suffix != ".html" and (".min." in path.name or _is_minified(text)):
+        return len(data), len(data)
+    minified = MINIFIERS[path.suffix](text).encode("utf-8")
+    if len(minified) >= len(data):
+        return len(data), len(data)
+    path.write_bytes(minified)
+    return len(data), len(minified)
+
+
+def precompress(path: Path) -> tuple[int, int]:
+    """Write a gzipped copy of *path*, returning the sizes of both."""
+    data = path.read_bytes()
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    gz_path = path.with_name(f"{path.name}.gz")
+    if len(compressed) >= len(data):
+        gz_path.unlink(missing_ok=True)
+        return len(data), len(data)
+    gz_path.write_bytes(compressed)
+    return len(data), len(compressed)
+
+
+def rewrite_html(path: Path, renamed: dict[str, str]) -> bool:
+    """Point the references to renamed static files in *path* to the new names."""
+
+    def replace(match: re.Match[str]) -> str:
+        return renamed.get(match.group(1), match.group(0))
+
+    text = path.read_text(encoding="utf-8")
+    rewritten = STATIC_REFERENCE.sub(replace, text)
+    if rewritten == text:
+        return False
+    path.write_text(rewritten, encoding="utf-8")
+    return True
+
+
+def rewrite_css(path: Path, outdir: Path, renamed: dict[str, str]) -> bool:
+    """Point the relative ``url()`` references in *path* to renamed files."""
+    directory = path.parent.relative_to(outdir).as_posix()
+
+    def replace(match: re.Match[str]) -> str:
+        quote, url = match.groups()
+        if "://" in url or url.startswith(("data:", "/", "#")):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(directory, url.split("?")[0]))
+        if target not in renamed:
+            return match.group(0)
+        new = posixpath.relpath(renamed[target], directory)
+        return f"url({quote}{new}{quote})"
+
+    text = path.read_text(encoding="utf-8")
+    rewritten = CSS_URL.sub(replace, text)
+    if rewritten == text:
+        return False
+    path.write_text(rewritten, encoding="utf-8")
+    return True
+
+
+def hash_static(outdir: Path) -> dict[str, str]:
+    """Rename the assets in ``_static/``, returning their old and new paths.
+
+    Other files are renamed first, as renaming them changes the stylesheets
+    referring to them.
+    """
+    static = outdir / "_static"
+    assets = [
+        path
+        for path in sorted(static.rglob("*"))
+        if path.is_file()
+        and path.suffix in HASHED_SUFFIXES
+        and not HASHED_NAME.search(path.name)
+    ]
+    renamed = {}
+    for path in sorted(assets, key=lambda path: path.suffix == ".css"):
+        if path.suffix == ".css":
+            rewrite_css(path, outdir, renamed)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:8]
+        new_path = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+        path.replace(new_path)
+        renamed[path.relative_to(outdir).as_posix()] = new_path.relative_to(
+            outdir
+        ).as_posix()
+    return renamed
+
+
+def _files(outdir: Path, suffixes: frozenset[str]) -> list[Path]:
+    return [
+        path
+        for path in sorted(outdir.rglob("*"))
+        if path.suffix in suffixes and path.is_file()
+    ]
+
+
+def _minifiable(outdir: Path) -> list[Path]:
+    return [
+        path
+        for path in _files(outdir, frozenset(MINIFIERS))
+        if path.suffix != ".js" or path.relative_to(outdir).as_posix() in OWN_SCRIPTS
+    ]
+
+
+def _report(action: str, sizes: list[tuple[int, int]]) -> None:
+    before = sum(size for size, _ in sizes)
+    after = sum(size for _, size in sizes)
+    print(
+        f"{action} {len(sizes)} files: {before / 1024:,.0f} KiB -> "
+        f"{after / 1024:,.0f} KiB ({(before - after) / 1024:,.0f} KiB saved)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "outdir",
+        nargs="?",
+        type=Path,
+        default=ROOT / "_build" / "html",
+        help="Output directory of the html or dirhtml builder (default: _build/html)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count(), help="Number of processes to use"
+    )
+    parser.add_argument("--no-minify", action="store_true", help="Don't minify")
+    parser.add_argument(
+        "--no-hash", action="store_true", help="Don't rename the static files"
+    )
+    parser.add_argument(
+        "--no-gzip", action="store_true", help="Don't write gzipped copies"
+    )
+    args = parser.parse_args()
+    outdir = args.outdir.resolve()
+    if not (outdir / "_static").is_dir():
+        parser.error(f"{outdir} is not the output of the html or dirhtml builder")
+
+    with ProcessPoolExecutor(args.jobs) as executor:
+        if not args.no_minify:
+            # Static files are minified before they're hashed
+            paths = _minifiable(outdir)
+            _report("minified", list(executor.map(minify, paths, chunksize=16)))
+
+        if not args.no_hash:
+            renamed = hash_static(outdir)
+            paths = _files(outdir, frozenset({".html"}))
+            rewritten = sum(
+                executor.map(rewrite_html, paths, [renamed] * len(paths), chunksize=16)
+            )
+            print(
+                f"renamed {len(renamed)} static files, "
+                f"updated the references in {rewritten} pages"
+            )
+
+        if not args.no_gzip:
+            paths = _files(outdir, GZIP_SUFFIXES)
+            _report(
+                "precompressed", list(executor.map(precompress, paths, chunksize=16))
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Sphinx extension: redirects for pages that have moved.
+
+``redirects`` maps the old name of a page to its new name, both relative to
+the source directory, with or without a source suffix. The map is compiled
+once per build: chains of redirects are collapsed so that every old page
+points straight at its final destination, and cycles are reported as
+configuration errors. Redirects whose final destination is not a document,
+or whose old name is still a document, are reported as warnings once the
+sources have been read.
+
+After a successful HTML or dirhtml build, the compiled table is written to
+``redirects.json`` in the output directory, mapping old URLs to new ones
+relative to the root of the site, for the web server or hosting service to
+apply. A small HTML page that redirects the browser is only written for
+each old URL if ``redirects_write_stubs`` is true.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from sphinx.errors import ConfigError
+from sphinx.util import logging
+from sphinx.util.osutil import relative_uri
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.builders import Builder
+    from sphinx.config import Config
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+REDIRECT_FILE = "redirects.json"
+
+STUB = """\
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="0; url={url}">
+</head>
+<body>
+<script>
+window.location.replace("{url}" + window.location.search + window.location.hash);
+</script>
+<p>This page has moved to <a href="{url}">{url}</a>.</p>
+</body>
+</html>
+"""
+
+
+def _docname(name: str, suffixes: tuple[str, ...]) -> str:
+    for suffix in suffixes:
+        if name.endswith(suffix):
+            return name.removesuffix(suffix)
+    return name
+
+
+def compile_redirects(
+    redirects: dict[str, str], suffixes: tuple[str, ...]
+) -> dict[str, str]:
+    """Return *redirects* as docnames, each mapped to its final destination.
+
+    Raise ConfigError if following the redirects from a page leads back to it.
+    """
+    graph = {
+        _docname(source, suffixes): _docname(target, suffixes)
+        for source, target in redirects.items()
+    }
+    compiled: dict[str, str] = {}
+    for start in graph:
+        # Follow the chain until a page that isn't redirected, or one whose
+        # destination is already known
+        chain = []
+        docname = start
+        while docname in graph and docname not in compiled:
+            if docname in chain:
+                cycle = " -> ".join([*chain[chain.index(docname) :], docname])
+                msg = f"redirects contains a cycle: {cycle}"
+                raise ConfigError(msg)
+            chain.append(docname)
+            docname = graph[docname]
+        final = compiled.get(docname, docname)
+        for source in chain:
+            compiled[source] = final
+    return compiled
+
+
+def _compile(app: Sphinx, config: Config) -> None:
+    app._compiled_redirects = compile_redirects(
+        config.redirects, tuple(config.source_suffix)
+    )
+
+
+def _check(app: Sphinx, env: BuildEnvironment) -> None:
+    for source, target in app._compiled_redirects.items():
+        if source in env.found_docs:
+            logger.warning(
+                "redirect from %s, which is still a document, to %s",
+                source,
+                target,
+                type="redirects",
+                subtype="source",
+            )
+        if target not in env.found_docs:
+            logger.warning(
+                "redirect from %s to %s, which is not a document",
+                source,
+                target,
+                type="redirects",
+                subtype="target",
+            )
+
+
+def redirect_urls(builder: Builder, redirects: dict[str, str]) -> dict[str, str]:
+    """Return the URLs of the pages in *redirects* for *builder*."""
+    return {
+        builder.get_target_uri(source): builder.get_target_uri(target)
+        for source, target in sorted(redirects.items())
+    }
+
+
+def _write(app: Sphinx, exception: Exception | None) -> None:
+    if exception is not None or app.builder.name not in {"html", "dirhtml"}:
+        return
+    # Never replace a page that still exists with a redirect
+    redirects = {
+        source: target
+        for source, target in app._compiled_redirects.items()
+        if source not in app.env.found_docs
+    }
+    urls = redirect_urls(app.builder, redirects)
+    outdir = app.builder.outdir
+    with open(outdir / REDIRECT_FILE, "w", encoding="utf-8") as f:
+        json.dump(urls, f, indent=2)
+        f.write("\n")
+
+    if not app.config.redirects_write_stubs:
+        return
+    for source, target in urls.items():
+        stub = outdir / source
+        if source == "" or source.endswith("/"):
+            stub /= "index.html"
+        url = relative_uri(source, target) or "./"
+        stub.parent.mkdir(parents=True, exist_ok=True)
+        stub.write_text(STUB.format(url=url), encoding="utf-8")
+    logger.info("wrote %d redirect pages", len(urls))
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.add_config_value("redirects", {}, "", types=(dict,))
+    app.add_config_value("redirects_write_stubs", False, "", types=(bool,))
+    app.connect("config-inited", _compile)
+    app.connect("env-check-consistency", _check)
+    app.connect("build-finished", _write)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
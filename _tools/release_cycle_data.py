@@ -0,0 +1,50 @@
+"""Load release-cycle.json, shared by conf.py and generate_release_cycle.py.
+
+The document is cached under ``_build/.cache/``. These environment variables
+change where it comes from:
+
+``RELEASE_CYCLE_JSON``
+    Path to a local copy to use instead of the network (e.g. a test fixture).
+``RELEASE_CYCLE_OFFLINE``
+    If set to a non-empty value, only use the last cached copy.
+``RELEASE_CYCLE_TTL``
+    Seconds a cached copy is used before revalidating it (default 3600).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from http_cache import CACHE_DIR, fetch
+
+URL = "https://peps.python.org/api/release-cycle.json"
+CACHE_FILE = CACHE_DIR / "release-cycle.json"
+DEFAULT_TTL = 3600
+
+
+def read_release_cycle(
+    *,
+    source: str | os.PathLike[str] | None = None,
+    offline: bool | None = None,
+    ttl: float | None = None,
+) -> bytes:
+    """Return the raw bytes of release-cycle.json.
+
+    Arguments left as None fall back to the environment variables described
+    in the module docstring.
+    """
+    source = source or os.getenv("RELEASE_CYCLE_JSON")
+    if source:
+        return Path(source).read_bytes()
+    if offline is None:
+        offline = bool(os.getenv("RELEASE_CYCLE_OFFLINE"))
+    if ttl is None:
+        ttl = float(os.getenv("RELEASE_CYCLE_TTL", DEFAULT_TTL))
+    return fetch(URL, CACHE_FILE, ttl=ttl, offline=offline)
+
+
+def load_release_cycle(**kwargs) -> dict[str, dict[str, str | int]]:
+    """Return release-cycle.json decoded; see read_release_cycle()."""
+    return json.loads(read_release_cycle(**kwargs).decode("utf-8"))
@@ -0,0 +1,256 @@
+"""Compute every coordinate of a release-cycle chart up front.
+
+The template only emits the numbers computed here. Dates are converted to
+day ordinals and mapped to X coordinates in one pass per column. Beyond
+NUMPY_MIN_VALUES coordinates, NumPy is used if it is installed; both give the
+same floats. Real charts are far smaller: importing NumPy takes longer than
+it would save them.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import functools
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from generate_release_cycle import Version
+
+# Scale. Should be roughly the pixel size of the font.
+# All later sizes are multiplied by this, so you can think of all other
+# numbers being multiples of the font size, like using `em` units in
+# CSS.
+# (Ideally we'd actually use `em` units, but SVG viewBox doesn't take
+# those.)
+DEFAULT_SCALE = 18
+
+# Below this many coordinates in one pass, plain Python beats importing NumPy
+NUMPY_MIN_VALUES = 100_000
+
+# Uppercase sizes are un-scaled
+
+# Width of the drawing and main parts
+DIAGRAM_WIDTH = 46
+LEGEND_WIDTH = 7
+RIGHT_MARGIN = 0.5
+
+# Height of one line. If you change this you'll need to tweak
+# some positioning numbers as well.
+LINE_HEIGHT = 1.5
+
+
+@dataclass(frozen=True, slots=True)
+class RowLayout:
+    """Coordinates for one version's row of the chart."""
+
+    version: Version
+    shaded: bool
+    shade_y: float
+    top_y: float
+    start_x: float
+    middle_x: float
+    end_x: float
+    width: float
+    inner_start_x: float
+    inner_end_x: float
+    label_x: float
+    label_anchor: str
+    label_y: float
+    legend_y: float
+
+
+@dataclass(frozen=True, slots=True)
+class YearLayout:
+    """Coordinates for one year's label and the line that follows it."""
+
+    label: str
+    label_x: float
+    # None for the last year, which has no line after it
+    line_x: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class ChartLayout:
+    """Everything the template needs to draw one chart."""
+
+    scale: float
+    small_font_size: float
+    diagram_width: float
+    diagram_height: float
+    line_height: float
+    axis_y: float
+    legend_width: float
+    legend_x: float
+    right_margin: float
+    fade_x: float
+    radius: float
+    blob_height: float
+    inner_height: float
+    today_x: float
+    rows: tuple[RowLayout, ...]
+    years: tuple[YearLayout, ...]
+
+
+@functools.cache
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _ordinals_to_x(
+    ordinals: Sequence[int], first: int, total_days: int, scale: float
+) -> list[float]:
+    """Convert day ordinals to SVG X coordinates."""
+    span = DIAGRAM_WIDTH - LEGEND_WIDTH - RIGHT_MARGIN
+    if len(ordinals) >= NUMPY_MIN_VALUES and (np := _numpy()) is not None:
+        ratio = (np.asarray(ordinals, dtype=np.int64) - first) / total_days
+        return ((ratio * span + LEGEND_WIDTH) * scale).tolist()
+    return [((o - first) / total_days * span + LEGEND_WIDTH) * scale for o in ordinals]
+
+
+def _rows_to_y(rows: Sequence[int], line_height: float) -> list[float]:
+    """Convert row numbers to the SVG Y coordinate of their baseline."""
+    if len(rows) >= NUMPY_MIN_VALUES and (np := _numpy()) is not None:
+        return (np.asarray(rows, dtype=np.int64) * line_height).tolist()
+    return [row * line_height for row in rows]
+
+
+def _round(value: float, ndigits: int) -> float | int:
+    value = round(value, ndigits)
+    # Print 18 rather than 18.0
+    return int(value) if value.is_integer() else value
+
+
+def _rounded(layout, ndigits: int):
+    """Return a copy of a layout dataclass with its floats rounded."""
+    return replace(
+        layout,
+        **{
+            field.name: _round(value, ndigits)
+            for field in fields(layout)
+            if isinstance(value := getattr(layout, field.name), float)
+        },
+    )
+
+
+def format_year(year: int) -> str:
+    """Format year number for display"""
+    return f"'{year % 100:02}"
+
+
+def layout_chart(
+    versions: Sequence[Version],
+    rows: dict[str, int],
+    first_date: dt.date,
+    today: dt.date,
+    scale: float = DEFAULT_SCALE,
+    precision: int | None = None,
+) -> ChartLayout:
+    """Lay out *versions*, newest first, numbered by *rows* from the bottom.
+
+    With *precision*, every coordinate is rounded to that many decimals.
+    """
+    last_date = max(version.end_of_life_date for version in versions)
+    first = first_date.toordinal()
+    total_days = last_date.toordinal() - first
+    years = range(first_date.year, last_date.year + 1)
+    line_height = LINE_HEIGHT * scale
+    diagram_height = (rows[versions[0].key] + 2) * LINE_HEIGHT * scale
+    radius = 0.25 * scale
+    blob_height = 1.25 * scale
+
+    # Oldest first, the order they are drawn in
+    versions = versions[::-1]
+    count = len(versions)
+    xs = _ordinals_to_x(
+        [version.first_release_date.toordinal() for version in versions]
+        + [version.start_security_date.toordinal() for version in versions]
+        + [version.end_of_life_date.toordinal() for version in versions]
+        + [dt.date(year, 1, 1).toordinal() for year in (*years, years.stop)]
+        + [today.toordinal()],
+        first,
+        total_days,
+        scale,
+    )
+    start_xs = xs[:count]
+    security_xs = xs[count : 2 * count]
+    end_xs = xs[2 * count : 3 * count]
+    year_xs = xs[3 * count : -1]
+    row_numbers = [rows[version.key] for version in versions]
+    ys = _rows_to_y(row_numbers, line_height)
+
+    row_layouts = []
+    for version, row, y, start_x, security_x, end_x in zip(
+        versions, row_numbers, ys, start_xs, security_xs, end_xs, strict=True
+    ):
+        middle_x = min(end_x, security_x)
+        if version.status == "bugfix":
+            label_x, label_anchor = (start_x + middle_x) / 2, "middle"
+        elif version.status == "security":
+            label_x, label_anchor = (middle_x + end_x) / 2, "middle"
+        elif version.status == "end-of-life":
+            label_x, label_anchor = end_x + (0.25 * scale), "start"
+        else:
+            label_x, label_anchor = start_x - (0.25 * scale), "end"
+        row_layouts.append(
+            RowLayout(
+                version=version,
+                shaded=bool(row % 2),
+                shade_y=y - 1.125 * scale,
+                top_y=y - 1 * scale,
+                start_x=start_x,
+                middle_x=middle_x,
+                end_x=end_x,
+                width=end_x - start_x,
+                inner_start_x=start_x + radius,
+                inner_end_x=end_x - radius,
+                label_x=label_x,
+                label_anchor=label_anchor,
+                label_y=y - 0.1 * scale,
+                legend_y=y,
+            )
+        )
+
+    year_layouts = tuple(
+        YearLayout(
+            label=format_year(year),
+            label_x=(year_xs[i] + year_xs[i + 1]) / 2,
+            line_x=year_xs[i + 1] if year != years[-1] else None,
+        )
+        for i, year in enumerate(years)
+    )
+
+    layout = ChartLayout(
+        scale=scale,
+        small_font_size=scale * 0.75,
+        diagram_width=DIAGRAM_WIDTH * scale,
+        diagram_height=diagram_height,
+        line_height=line_height,
+        axis_y=diagram_height - line_height,
+        legend_width=LEGEND_WIDTH * scale,
+        legend_x=0.5 * scale,
+        right_margin=RIGHT_MARGIN * scale,
+        fade_x=LEGEND_WIDTH * scale - RIGHT_MARGIN * scale,
+        radius=radius,
+        blob_height=blob_height,
+        inner_height=-blob_height + 2 * radius,
+        today_x=xs[-1],
+        rows=tuple(row_layouts),
+        years=year_layouts,
+    )
+    if precision is None:
+        return layout
+    return _rounded(
+        replace(
+            layout,
+            rows=tuple(_rounded(row, precision) for row in layout.rows),
+            years=tuple(_rounded(year, precision) for year in layout.years),
+        ),
+        precision,
+    )
@@ -0,0 +1,141 @@
+"""Sphinx extension: split the search index into shards loaded on demand.
+
+Sphinx's ``searchindex.js`` holds every term of every page, and the search
+page has to load all of it before the first query. This writes the same index
+again under ``_searchindex/`` in the output directory, as:
+
+* ``_meta.js``: everything but the terms (page names and titles, section
+  titles, index entries, objects) and the list of shards
+* one file per term prefix, of ``search_shards_prefix_length`` characters,
+  holding the terms starting with it and the numbers of the pages they're on
+
+``_templates/search.html`` then loads ``_static/search_shards.js`` instead of
+``searchindex.js``, which fetches ``_meta.js`` and the shards of the words
+searched for. The shards are scripts rather than JSON so that search works
+from ``file://`` URLs as well. If a shard can't be loaded, the full
+``searchindex.js`` is used. As the terms in the shards loaded are all
+starting with the words searched for, partial matches are only found at the
+start of words.
+
+With ``search_shards_compress``, a gzipped copy of each file is written next
+to it, for web servers serving precompressed files. Files are only rewritten
+when their contents change.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from http_cache import write_atomic, write_if_changed
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.util.typing import ExtensionMetadata
+
+logger = logging.getLogger(__name__)
+
+SHARD_DIR = "_searchindex"
+TERM_KEYS = ("terms", "titleterms")
+
+
+def shard_name(term: str, prefix_length: int) -> str:
+    """Return the name of the shard of *term*, safe to use as a file name."""
+    # Must match shardName() in _static/search_shards.js
+    prefix = term[:prefix_length]
+    if re.fullmatch(r"[a-z0-9]+", prefix):
+        return prefix
+    return "_" + prefix.encode().hex()
+
+
+def split_index(index: dict, prefix_length: int) -> tuple[dict, dict[str, dict]]:
+    """Split the frozen search *index*, returning its metadata and shards."""
+    shards: defaultdict[str, dict] = defaultdict(lambda: {key: {} for key in TERM_KEYS})
+    for key in TERM_KEYS:
+        for term, pages in index[key].items():
+            # Terms of pages since removed are left with no pages
+            if pages != []:
+                shards[shard_name(term, prefix_length)][key][term] = pages
+    meta = {
+        "prefix_length": prefix_length,
+        "shards": sorted(shards),
+        "index": {key: value for key, value in index.items() if key not in TERM_KEYS},
+    }
+    return meta, dict(shards)
+
+
+def _script(call: str, *args: object) -> bytes:
+    """Return a script calling ``SearchShards.<call>(*args)``."""
+    arguments = ",".join(
+        json.dumps(arg, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        for arg in args
+    )
+    return f"SearchShards.{call}({arguments})\n".encode()
+
+
+def _write_shard(path: Path, data: bytes, compress: bool) -> bool:
+    """Write *data* to *path* unless it's already there, returning if it was."""
+    changed = write_if_changed(path, data)
+    gz_path = path.with_name(f"{path.name}.gz")
+    if compress and (changed or not gz_path.exists()):
+        write_atomic(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+    elif not compress:
+        gz_path.unlink(missing_ok=True)
+    return changed
+
+
+def _write_shards(app: Sphinx, exception: Exception | None) -> None:
+    indexer = getattr(app.builder, "indexer", None)
+    if exception is not None or app.builder.format != "html" or indexer is None:
+        return
+
+    config = app.config
+    meta, shards = split_index(indexer.freeze(), config.search_shards_prefix_length)
+    outdir = Path(app.outdir) / SHARD_DIR
+    outdir.mkdir(exist_ok=True)
+    files = {"_meta.js": _script("load", "_meta", meta)}
+    files |= {
+        f"{name}.js": _script("load", name, shard) for name, shard in shards.items()
+    }
+
+    for path in outdir.iterdir():
+        if path.name.removesuffix(".gz") not in files:
+            path.unlink()
+    written = sum(
+        _write_shard(outdir / name, data, config.search_shards_compress)
+        for name, data in files.items()
+    )
+    sizes = sorted(len(data) for name, data in files.items() if name != "_meta.js")
+    logger.info(
+        "search index split into %d shards (%d updated), largest %.1f KiB, "
+        "median %.1f KiB, metadata %.1f KiB",
+        len(shards),
+        written,
+        sizes[-1] / 1024 if sizes else 0,
+        sizes[len(sizes) // 2] / 1024 if sizes else 0,
+        len(files["_meta.js"]) / 1024,
+    )
+
+
+def _page_context(
+    app: Sphinx,
+    pagename: str,
+    templatename: str,
+    context: dict[str, object],
+    doctree: object,
+) -> None:
+    if templatename == "search.html":
+        context["search_shards"] = getattr(app.builder, "indexer", None) is not None
+
+
+def setup(app: Sphinx) -> ExtensionMetadata:
+    app.add_config_value("search_shards_prefix_length", 2, "html", int)
+    app.add_config_value("search_shards_compress", False, "html", bool)
+    app.connect("html-page-context", _page_context)
+    app.connect("build-finished", _write_shards)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
@@ -0,0 +1,141 @@
+"""Run the cached linkcheck builder against a local HTTP server.
+
+Run with ``python -m pytest _tools/test_linkcheck_cache.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import linkcheck_cache
+import pytest
+from sphinx.application import Sphinx
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """Serves a directory, recording the path and start time of each request."""
+
+    def __init__(self, *args, requests: list, **kwargs) -> None:
+        self.requests = requests
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        self.requests.append((self.path, time.monotonic()))
+        # Slow enough for concurrent requests to overlap
+        time.sleep(0.05)
+        return super().send_head()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / "www"
+    root.mkdir()
+    for name in "abcd":
+        (root / f"{name}.html").write_text(f'<h1 id="{name}">{name}</h1>')
+    requests = []
+    handler = partial(RecordingHandler, directory=root, requests=requests)
+    with ThreadingHTTPServer(("127.0.0.1", 0), handler) as httpd:
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"127.0.0.1:{httpd.server_port}", requests
+        httpd.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "linkcheck.json"
+    monkeypatch.setattr(linkcheck_cache, "CACHE_FILE", path)
+    return path
+
+
+def linkcheck(tmp_path, host, pages, **config) -> dict[str, str]:
+    """Check links to *pages* on *host*, returning the status of each URL."""
+    srcdir = tmp_path / "src"
+    srcdir.mkdir(exist_ok=True)
+    (srcdir / "conf.py").write_text("extensions = ['linkcheck_cache']\n")
+    (srcdir / "index.rst").write_text(
+        "Links\n=====\n\n"
+        + "".join(f"* `<http://{host}/{page}>`__\n" for page in pages)
+    )
+    outdir = tmp_path / "out"
+    app = Sphinx(
+        srcdir,
+        srcdir,
+        outdir,
+        tmp_path / "doctrees",
+        "linkcheck",
+        confoverrides=config,
+        status=None,
+        warning=None,
+        freshenv=True,
+    )
+    app.build()
+    results = [
+        json.loads(line)
+        for line in (outdir / "output.json").read_text(encoding="utf-8").splitlines()
+    ]
+    return {result["uri"].rsplit("/", 1)[1]: result["status"] for result in results}
+
+
+def test_working_links_are_reused(tmp_path, server, cache_file):
+    host, requests = server
+    pages = ["a.html", "b.html#b", "missing.html"]
+    assert linkcheck(tmp_path, host, pages) == {
+        "a.html": "working",
+        "b.html#b": "working",
+        "missing.html": "broken",
+    }
+    cached = json.loads(cache_file.read_text(encoding="utf-8"))["results"]
+    assert sorted(uri.rsplit("/", 1)[1] for uri in cached) == ["a.html", "b.html#b"]
+
+    requests.clear()
+    assert linkcheck(tmp_path, host, pages)["a.html"] == "working"
+    # Only the broken link is checked again
+    assert {path for path, _ in requests} == {"/missing.html"}
+
+
+def test_links_are_checked_again(tmp_path, server, cache_file):
+    host, requests = server
+    linkcheck(tmp_path, host, ["a.html"])
+
+    requests.clear()
+    linkcheck(tmp_path, host, ["a.html"], linkcheck_cache_ttl=0)
+    assert [path for path, _ in requests] == ["/a.html"]
+
+    # A link that stops working is dropped from the cache
+    (tmp_path / "www" / "a.html").unlink()
+    assert linkcheck(tmp_path, host, ["a.html"], linkcheck_cache_ttl=0) == {
+        "a.html": "broken"
+    }
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["results"] == {}
+    requests.clear()
+    linkcheck(tmp_path, host, ["a.html"])
+    assert {path for path, _ in requests} == {"/a.html"}
+
+
+def test_host_limits(tmp_path, server):
+    host, requests = server
+    interval = 0.2
+    pages = ["a.html", "b.html", "c.html", "d.html"]
+    statuses = linkcheck(
+        tmp_path,
+        host,
+        pages,
+        linkcheck_anchors=False,
+        linkcheck_workers=4,
+        linkcheck_host_limits={host: (1, interval)},
+    )
+    assert set(statuses.values()) == {"working"}
+    starts = sorted(start for _, start in requests)
+    assert len(starts) == len(pages)
+    assert all(
+        later - earlier >= interval * 0.9
+        for earlier, later in zip(starts, starts[1:], strict=False)
+    )
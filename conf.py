@@ -1,8 +1,19 @@
-import json
 import os
-from urllib.request import urlopen
+import sys
+
+sys.path.insert(0, os.path.abspath('_tools'))
+
+# Imported first to time the rest of this file, see _tools/build_timings.py
+import build_timings  # noqa: E402, F401
 
 extensions = [
+    'build_timings',
+    'git_last_updated',
+    'intersphinx_cache',
+    'linkcheck_cache',
+    'main_version',
+    'redirects',
+    'search_shards',
     'linklint.ext',
     'notfound.extension',
     'sphinx.ext.extlinks',
@@ -10,12 +21,11 @@ extensions = [
     'sphinx.ext.todo',
     'sphinx_copybutton',
     'sphinx_inline_tabs',
-    'sphinx_last_updated_by_git',
     'sphinxcontrib.youtube',
     'sphinxext.opengraph',
-    'sphinxext.rediraffe',
 ]
 
+# Pages are dated by their last commit, see _tools/git_last_updated.py
 html_last_updated_fmt = '%b %d, %Y'
 
 # The master toctree document.
@@ -102,9 +112,14 @@ linkcheck_anchors_ignore = [
     r'\/.*',
 ]
 
+# GitHub renders line numbers, comments and README headings with JavaScript,
+# so their anchors aren't in the HTML linkcheck gets
+linkcheck_anchors_ignore_for_url = [
+    r'https://github.com/.*',
+]
+
 linkcheck_ignore = [
     # Checks fail due to rate limits
-    r'https://github.com/.*',
     r'https://www.gnu.org/software/autoconf/',
     # The Discourse groups are private unless you are logged in
     'https://discuss.python.org/groups/staff',
@@ -112,15 +127,28 @@ linkcheck_ignore = [
     'https://discuss.python.org/groups/admins',
     # "Anchor not found":
     r'https://packaging.python.org/.*#',
-    # "-rate limited-", causing a timeout
-    r'https://stackoverflow.com/.*',
     # Discord doesn't allow robot crawlers: "403 Client Error: Forbidden"
     r'https://support.discord.com/hc/en-us/articles/219070107-Server-Nicknames',
     # Patreon also gives 403 to the GHA linkcheck runner
     r'https://www.patreon.com/.*',
 ]
 
-rediraffe_redirects = {
+# Results are cached under _build/.cache/linkcheck.json, see
+# _tools/linkcheck_cache.py. Seconds to trust a working link for:
+linkcheck_cache_ttl = 7 * 86400
+
+# Check rate-limited hosts slowly rather than ignoring them:
+# host: (requests at once, minimum seconds between requests)
+linkcheck_host_limits = {
+    'github.com': (1, 1.0),
+    'stackoverflow.com': (1, 2.0),
+}
+
+# Old page -> new page. Compiled by _tools/redirects.py into
+# _build/<builder>/redirects.json. The HTML pages that redirect the browser
+# are only needed where the host doesn't apply that file, i.e. on Read the Docs.
+redirects_write_stubs = bool(os.getenv("READTHEDOCS"))
+redirects = {
     # Development Tools
     "clang.rst": "development-tools/clang.rst",
     "gdb.rst": "development-tools/gdb.rst",
@@ -245,24 +273,24 @@ intersphinx_mapping = {
     'diataxis': ('https://diataxis.fr/', None),
 }
 
+# Inventories are cached under _build/.cache/intersphinx/, see
+# _tools/intersphinx_cache.py. Set INTERSPHINX_OFFLINE=1 to only use that cache.
+# Seconds to use a cached inventory for before revalidating it
+intersphinx_disk_cache_ttl = 86400
+
 todo_include_todos = True
 
 # sphinx-notfound-page
 notfound_urls_prefix = "/"
 
-# Dynamically expose the Python version associated with the "main" branch.
-# Exactly one entry in ``release-cycle.json`` should have ``"branch": "main"``.
-with urlopen("https://peps.python.org/api/release-cycle.json") as _f:
-    _cycle = json.loads(_f.read().decode("utf-8"))
-
-_main_version = next(
-    version for version, data in _cycle.items() if data.get("branch") == "main"
-)
-
 # prolog and epilogs
-rst_prolog = f"""
+# |main_version| is the Python version of the "main" branch: exactly one entry
+# in ``release-cycle.json`` should have ``"branch": "main"``. It is filled in
+# when the pages are written, so that a new version only rewrites the pages
+# using it; see _tools/main_version.py.
+rst_prolog = """
 
-.. |main_version| replace:: {_main_version}
+.. |main_version| main-version::
 
 """
 
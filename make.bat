@@ -47,7 +47,7 @@ if "%1" == "clean" (
 )
 
 if "%1" == "versions" (
-	%PYTHON% _tools/generate_release_cycle.py
+	%PYTHON% _tools/generate_release_cycle.py --compact
 	if errorlevel 1 exit /b 1
 	echo.
 	echo Release cycle data generated.
@@ -81,7 +81,7 @@ if ($target -Eq "check") {
 }
 
 if ($target -Eq "versions") {
-    & $_PYTHON _tools/generate_release_cycle.py
+    & $_PYTHON _tools/generate_release_cycle.py --compact
     if ($LASTEXITCODE -Ne 0) { exit 1 }
     Write-Host "Release cycle data generated."
     Exit $LASTEXITCODE